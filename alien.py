@@ -1,5 +1,4 @@
-import pygame
-from pygame.sprite import Sprite
+from pygame.sprite import Sprite, Group
 
 class Alien(Sprite):
     """A class to represent a single alien in the fleet."""
@@ -9,8 +8,8 @@ class Alien(Sprite):
         self.screen = ai_game.screen
         self.settings = ai_game.settings
 
-        # Load the alien image and set its rect attribute.
-        self.image = pygame.image.load("images/alien.bmp")
+        # Use the shared alien image and set its rect attribute.
+        self.image = ai_game.assets.image("alien.bmp")
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen.
@@ -20,15 +19,45 @@ class Alien(Sprite):
         # Store the alien's exact horizontal position.
         self.x = float(self.rect.x)
 
+    def place(self, x, y):
+        """Move the alien to a new starting position."""
+        self.rect.topleft = (x, y)
+        self.x = float(self.rect.x)
+
     def check_edges(self):
         """Return True if alien is at the edge of screen."""
         screen_rect = self.screen.get_rect()
         if self.rect.right >= screen_rect.right or self.rect.left <= 0:
             return True
 
-    def update(self):
-        """Move the alien to the right or left."""
+    def update(self, dt):
+        """Move the alien to the right or left over dt seconds."""
         self.x += (self.settings.alien_speed *
-                        self.settings.fleet_direction)
+                        self.settings.fleet_direction * dt)
         self.rect.x = self.x
 
+class AlienPool(Group):
+    """
+    A group of aliens that recycles them instead of allocating a new
+    fleet every level. Aliens that leave the group go back to the pool.
+    """
+
+    def __init__(self, ai_game):
+        """Start with an empty pool."""
+        super().__init__()
+        self.ai_game = ai_game
+        self.free = []
+        # The image every alien shares, for drawing the fleet in one call.
+        self.image = ai_game.assets.image("alien.bmp")
+
+    def spawn(self, x, y):
+        """Take an alien from the pool, place it and add it to the group."""
+        alien = self.free.pop() if self.free else Alien(self.ai_game)
+        alien.place(x, y)
+        self.add(alien)
+        return alien
+
+    def remove_internal(self, sprite):
+        """Return an alien to the pool when it leaves the group."""
+        super().remove_internal(sprite)
+        self.free.append(sprite)
@@ -1,33 +1,82 @@
+import os
 import sys
-import json
-from time import sleep
-from random import randint
+import time
+from random import Random
 
 import pygame
-import requests
 
 from settings import Settings
-from game_stats import GameStats
+from assets import Assets
+from text_cache import TextCache
+from persistence import HighScoreStore
+from game_stats import (GameStats, MENU, PLAYING, RESPAWNING,
+        LEVEL_TRANSITION, GAME_OVER)
 from button import Button
 from ship import Ship
-from bullet import Bullet
-from alien import Alien
+from bullet import ShipBullet, AlienBullet, BulletPool
+from alien import AlienPool
 from scoreboard import Scoreboard
-from shield import Shield
+from renderer import DirtyRenderer
+from layout import Layout
+from profiler import FrameProfiler
+from shield import Shield, ShieldGroup
+from fleet import ArrayFleet, array_fleet_available
+from collisions import groupcollide
+from fire_scheduler import FireScheduler
+from replay import Replay, MOVE_LEFT, MOVE_RIGHT, FIRE
+from controls import Controls
 
 class AlienInvasion:
     """Overall class to manage game assets and behavior"""
 
-    def __init__(self):
-        """Initialize the game, and create game resources"""
-        pygame.init()
-        self.settings = Settings()
-
-        self.screen = pygame.display.set_mode((self.settings.screen_width,
-            self.settings.screen_height))
+    def __init__(self, headless=False, seed=None, settings=None):
+        """
+        Initialize the game, and create game resources.
+        A headless game draws to an off-screen surface and never opens
+        a window; seed makes the alien fire pattern reproducible.
+        settings replaces the default Settings, e.g. in a sweep.
+        """
+        self.headless = headless
+        if headless:
+            # Keep SDL from looking for a real display.
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        # Only start the pygame modules the game uses; pygame.init()
+        #   would also open the audio device.
+        pygame.display.init()
+        pygame.font.init()
+        self.settings = settings or Settings()
+        self.rng = Random(seed)
+        self.fire_scheduler = FireScheduler(self)
+
+        if headless:
+            self.screen = pygame.Surface((self.settings.screen_width,
+                self.settings.screen_height))
+        else:
+            # SCALED lets SDL scale the logical screen to the window or
+            #   display, so the layout never depends on the real size.
+            flags = pygame.SCALED
+            if self.settings.fullscreen:
+                flags |= pygame.FULLSCREEN
+            self.screen = pygame.display.set_mode(
+                (self.settings.screen_width, self.settings.screen_height),
+                flags)
         self.settings.screen_width = self.screen.get_rect().width
         self.settings.screen_height = self.screen.get_rect().height
         pygame.display.set_caption("Alien Invasion")
+        self.clock = pygame.time.Clock()
+
+        # Show an empty window right away, before anything is loaded.
+        if not headless:
+            self.screen.fill(self.settings.bg_color)
+            pygame.display.flip()
+
+        # Load every image once, after the display format is known.
+        self.assets = Assets()
+        # Render every label and digit once, with one shared font.
+        self.text_cache = TextCache(self.assets.font(48))
+
+        # Load the saved scores; headless batch runs never write them.
+        self.highscores = HighScoreStore(self.settings, enabled=not headless)
 
         # Create an instance to store game statistics,
         #   and create a scoreboard
@@ -36,13 +85,25 @@ class AlienInvasion:
 
         # Initiate the ship, bullet and alien classes
         self.ship = Ship(self)
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-        self.alien_bullets = pygame.sprite.Group()
-        self.shields = pygame.sprite.Group()
+        self.bullets = BulletPool(self, ShipBullet,
+                self.settings.bullets_allowed)
+        self.aliens = AlienPool(self)
+        self.alien_bullets = BulletPool(self, AlienBullet,
+                self.settings.alien_bullet_pool_size)
+        self.shields = ShieldGroup(self.settings.shield_crater_radius)
+
+        # Everything is placed in logical screen coordinates.
+        self.layout = Layout(self)
+        # Positions of the aliens still to be created for the next fleet.
+        self.fleet_queue = []
+
+        # Optionally move the fleet as arrays instead of sprite by sprite.
+        self.fleet = None
+        if self.settings.array_fleet and array_fleet_available():
+            self.fleet = ArrayFleet(self)
 
         # Create the first fleet.
-        self._create_fleet()
+        self._create_fleet(self.stats.level)
 
         # Make the Play button.
         self.play_button = Button(self, "Play")
@@ -50,60 +111,182 @@ class AlienInvasion:
         # Initiate the different difficulty buttons.
         self._make_difficulty_buttons()  
 
+        # Only the parts of the screen that change get redrawn.
+        self.renderer = DirtyRenderer(self)
+
+        # Time every phase of every frame.
+        self.profiler = FrameProfiler(self)
+
+        # Keyboard and gamepad input, polled once per tick.
+        self.controls = Controls(self)
+        self.commands = {"play": self._play_pressed, "quit": self._quit,
+                "profiler_overlay": self._toggle_profiler_overlay,
+                "profiler_dump": self._dump_profile}
+        # Fire is requested by input and handled at the start of a tick.
+        self.fire_requested = False
+        # The replay of the game in progress, if replays are recorded.
+        self.replay = None
+        # The spectator server every tick is published to, if any.
+        self.spectators = None
+
     def run_game(self):
         """Start the main loop for the game"""
+        time_step = self.settings.time_step
+        accumulator = 0.0
         while True:
-            self._check_events()
+            # Wait for the next frame and add the elapsed time to the
+            #   accumulator, then run as many fixed ticks as it holds.
+            frame_time = self.clock.tick(self.settings.max_fps) / 1000
+            accumulator += min(frame_time, self.settings.max_frame_time)
+
+            with self.profiler.phase("events"):
+                self._check_events()
+
+            while accumulator >= time_step:
+                if self.stats.game_active:
+                    self._poll_controls()
+                    self._tick(time_step)
+                accumulator -= time_step
+
+            with self.profiler.phase("render"):
+                self._update_screen()
+            self.profiler.end_frame()
+
+            # Pick up edits to the difficulty profiles.
+            if self.settings.reload_if_changed():
+                self._check_replay_profile()
+
+            # Save the high score now and then, off the main thread.
+            self.highscores.update_high_score(self.stats.high_score)
+            self.highscores.checkpoint()
 
+    def run_headless(self, script=None, max_ticks=None):
+        """
+        Play one game as fast as possible without drawing anything
+        and return the final game statistics. script is called as
+        script(ai_game, tick) and returns the events for that tick.
+        """
+        time_step = self.settings.time_step
+        self._start_game()
+        tick = 0
+        while self.stats.game_active and (max_ticks is None
+                or tick < max_ticks):
+            if script:
+                for event in script(self, tick):
+                    self._handle_event(event)
             if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-                
-            self._update_screen()
+                self._poll_controls()
+                self._tick(time_step)
+            tick += 1
+        return self.stats
+
+    def _poll_controls(self):
+        """Take the input of this tick from the controls."""
+        self._apply_tick_input(self.controls.poll())
+
+    def _tick(self, dt):
+        """Apply the input for this tick, then advance the game by dt."""
+        if self.replay:
+            self.replay.record(self._tick_input())
+        if self.fire_requested:
+            self.fire_requested = False
+            self._fire_bullet()
+        self._update_simulation(dt)
+        if self.spectators:
+            self.spectators.publish()
+
+    def _tick_input(self):
+        """Return the input of this tick as replay bits."""
+        bits = 0
+        if self.ship.moving_left:
+            bits |= MOVE_LEFT
+        if self.ship.moving_right:
+            bits |= MOVE_RIGHT
+        if self.fire_requested:
+            bits |= FIRE
+        return bits
+
+    def _apply_tick_input(self, bits):
+        """Set the input of this tick from replay bits."""
+        self.ship.moving_left = bool(bits & MOVE_LEFT)
+        self.ship.moving_right = bool(bits & MOVE_RIGHT)
+        self.fire_requested = bool(bits & FIRE)
+
+    def _update_simulation(self, dt):
+        """Advance the game world by a single tick of dt seconds."""
+        if self.stats.state != PLAYING:
+            self._update_transition(dt)
+            return
+
+        with self.profiler.phase("ship"):
+            self.ship.update(dt)
+        with self.profiler.phase("bullets"):
+            self._update_bullets(dt)
+        # The ship may have been hit or the fleet cleared.
+        if self.stats.state == PLAYING:
+            with self.profiler.phase("aliens"):
+                self._update_aliens(dt)
+
+    def _update_transition(self, dt):
+        """Count down a timed state and leave it when time is up."""
+        # Build the queued part of the next fleet during the pause.
+        self._build_fleet(self.settings.fleet_chunk_size)
+        self.stats.state_timer -= dt
+        if self.stats.state_timer > 0:
+            return
+
+        if self.stats.state == RESPAWNING:
+            # Get rid of any remaining aliens and bullets and recenter ship.
+            self._Reset_aliens_bullets_ship()
+            self.stats.set_state(PLAYING)
+        elif self.stats.state == LEVEL_TRANSITION:
+            self._begin_next_level()
+            self.stats.set_state(PLAYING)
+        elif self.stats.state == GAME_OVER:
+            self._show_menu()
 
     def _make_difficulty_buttons(self):
         """Initiate the difficulty buttons"""
-        # Easy
         self.easy_button = Button(self, "Easy")
-        self.easy_button.rect.topleft = self.screen.get_rect().topleft
-        self.easy_button.rect.y = 520
-        self.easy_button.msg_image_rect.center = self.easy_button.rect.center
-
         # Medium is set as default
         self.medium_button = Button(self, "Medium")
-        self.medium_button.rect.top = self.screen.get_rect().top
-        medium_rect = self.medium_button.msg_image_rect
-        self.medium_button.rect.y = 520
-        medium_rect.center = self.medium_button.rect.center
         self.medium_button.change_button_color("Medium", "red")
-
-        # Hard
         self.hard_button = Button(self, "Hard")
-        self.hard_button.rect.topright = self.screen.get_rect().topright
-        self.hard_button.rect.y = 520
-        self.hard_button.msg_image_rect.center = self.hard_button.rect.center
+
+        # Line the buttons up below the Play button.
+        self.layout.place_button_row((self.easy_button, self.medium_button,
+                self.hard_button))
 
     def _check_events(self):
         """Respond to keypresses and mouse events."""
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self._write_highscore_to_file()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_difficulty_button(mouse_pos)
-                self._check_play_button(mouse_pos)
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
+            self._handle_event(event)
+
+    def _handle_event(self, event):
+        """Respond to a single live or scripted event."""
+        if event.type == pygame.QUIT:
+            self._quit()
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._check_difficulty_button(event.pos)
+            self._check_play_button(event.pos)
+        elif event.type == pygame.VIDEOEXPOSE:
+            self.renderer.invalidate()
+        else:
+            # Keys and gamepad buttons go through the keymap.
+            action = self.controls.handle_event(event)
+            if action:
+                self.commands[action]()
+
+    def _quit(self):
+        """Save the high score and leave the game."""
+        self._write_highscore_to_file()
+        sys.exit()
 
     def _write_highscore_to_file(self):
-        """Write the current highscore to a separate file"""
-        filename = "highscore.json"
-        with open (filename, "w") as f:
-            json.dump(self.stats.high_score, f)
+        """Write the current highscore and wait for it to be on disk"""
+        self._save_replay()
+        self.highscores.update_high_score(self.stats.high_score)
+        self.highscores.close()
 
     def _check_difficulty_button(self, mouse_pos):
         """Select difficulty by pressing the buttons"""
@@ -119,6 +302,10 @@ class AlienInvasion:
         if hard_clicked and not self.stats.game_active:
             self._hard_clicked()
 
+        # The menu only gets redrawn when a button changed color.
+        if easy_clicked or medium_clicked or hard_clicked:
+            self.renderer.invalidate()
+
     def _easy_clicked(self):
         """Change all button colors and change settings to easy."""
         # Change the collors of all the buttons
@@ -156,29 +343,33 @@ class AlienInvasion:
             # Reset the game settings.
             self._start_game()
 
-    def _check_keydown_events(self, event):
-        """Respond to key presses."""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = True
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
-        elif event.key == pygame.K_q:
-            self._write_highscore_to_file()
-            sys.exit()
-        elif event.key == pygame.K_SPACE:
-            self._fire_bullet()
-        elif event.key == pygame.K_p and self.stats.game_active == False:
+    def _play_pressed(self):
+        """Start a new game from the menu with the play key."""
+        if not self.stats.game_active:
             self._start_game()
 
-    def _check_keyup_events(self, event):
-        """Respond to key releases"""
-        if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
+    def _toggle_profiler_overlay(self):
+        """Show or hide the profiler overlay."""
+        self.profiler.toggle_overlay()
+        self.renderer.invalidate()
+
+    def _dump_profile(self):
+        """Write the profiler trace to its file."""
+        self.profiler.dump(self.settings.profiler_trace_file)
 
-    def _start_game(self):
+    def _start_game(self, seed=None):
         """Reset game stats and start a new game"""
+        # Every game gets its own seed, so it can be replayed.
+        if seed is None:
+            seed = self.rng.getrandbits(63)
+        self.rng.seed(seed)
+        if self.settings.record_replays:
+            self.replay = Replay(seed, self.settings.difficulty,
+                    self.settings.profiles[self.settings.difficulty].digest,
+                    self.settings.ticks_per_second)
+        self.fire_requested = False
+        self.controls.reset()
+
         # Reset the game statistics
         self.stats.reset_stats()
         # Reprep the resettet scoreboard images.
@@ -189,7 +380,7 @@ class AlienInvasion:
         # Hide the mouse cursor.
         pygame.mouse.set_visible(False)
         # Start the game.
-        self.stats.game_active = True
+        self.stats.set_state(PLAYING)
 
     def _prep_scoreboard_images(self):
         """Prep the scoreboard images at the start of the game"""
@@ -201,45 +392,44 @@ class AlienInvasion:
         """Remove aliens and bullets. Start a new alien fleet. 
             Center the ship"""
 
-        # Get rid of any remaining alines and bullets.
+        # Get rid of any remaining alines, bullets and shields.
         self.aliens.empty()
         self.bullets.empty()
         self.alien_bullets.empty()
+        self.shields.empty()
 
-        # Create a new fleet and center the ship.
-        self._create_fleet()
+        # Create a new fleet, fresh shields and center the ship.
+        self._create_fleet(self.stats.level)
+        # The difficulty may have changed since the last fleet.
+        self.fire_scheduler.reset()
         self.ship.center_ship()
         self._initiate_shields(self.settings.no_shields)
+        # Everything moved, so redraw the whole screen.
+        self.renderer.invalidate()
 
     def _fire_bullet(self):
         """Create a new bullet and add it to the bullets group."""
-        if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            new_bullet.rect.midtop = self.ship.rect.midtop
-            new_bullet.y = new_bullet.rect.y
-            self.bullets.add(new_bullet)
+        if (self.stats.state == PLAYING
+                and len(self.bullets) < self.settings.bullets_allowed):
+            self.bullets.spawn(self.ship.rect.midtop)
 
-    def _update_bullets(self):
+    def _update_bullets(self, dt):
         """Update position of bullets and get rid of old bullets"""
-        #Update bullet position.
-        self.bullets.update()
-        for bullet in self.alien_bullets.copy():
-            bullet.update_alien_bullet()
-            if bullet.rect.top >= self.screen.get_rect().height:
-                self.alien_bullets.remove(bullet)
-        
-        #Get rid of bullets that have disappeared.
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
-        
+        # Update bullet positions; the pools recycle bullets that
+        #   have disappeared.
+        self.bullets.update(dt)
+        self.alien_bullets.update(dt)
+
         self._check_bullet_collisions()
 
     def _check_bullet_collisions(self):
         """Respond to bullet-alien collisions"""
         # Remove any aliens and bullets that have collided.
-        collisions = pygame.sprite.groupcollide(
-                self.bullets, self.aliens, True, True)
+        if self.fleet:
+            collisions = self.fleet.groupcollide(self.bullets, True)
+        else:
+            collisions = groupcollide(self.bullets, self.aliens,
+                    True, True)
 
         if collisions:
             for aliens in collisions.values():
@@ -256,77 +446,148 @@ class AlienInvasion:
         if alien_bullet_hit_ship:
             self._ship_hit()
 
-        # Check if alien bullets or ship bullets collide with shield.
-        pygame.sprite.groupcollide(self.alien_bullets, self.shields,
-                True, True)
-        pygame.sprite.groupcollide(self.bullets, self.shields,
-                True, True)
-        # Check if aliens collide with shields.
-        pygame.sprite.groupcollide(self.aliens, self.shields, True, True)
+        # Let alien bullets and ship bullets chip away the shields.
+        self.shields.chip(groupcollide(self.alien_bullets, self.shields,
+                False, False))
+        self.shields.chip(groupcollide(self.bullets, self.shields,
+                False, False))
+        # Aliens that run into shields tear out what they overlap.
+        if self.fleet:
+            self.fleet.plow(self.shields)
+        else:
+            collisions = groupcollide(self.aliens, self.shields,
+                    False, False)
+            for alien, shields in collisions.items():
+                if any([self.shields.plow(shield, alien.rect)
+                        for shield in shields]):
+                    alien.kill()
 
     def _start_new_level(self):
         """Start a new level when all the aliens have been shot."""
         if not self.aliens:
-            # Destroy existing bullets and create new fleet. Increase the level,
-            # the speed and prep the level image.
-            self.bullets.empty()
-            self.alien_bullets.empty()
-            self.shields.empty()
-            self._create_fleet()
-            self._initiate_shields(self.settings.no_shields)
-            self.settings.increase_speed()
-            self.stats.level += 1
-            self.sb.prep_level()
-
-    def _update_aliens(self):
+            # Pause briefly before the next fleet arrives, and build the
+            #   fleet a chunk per tick meanwhile.
+            self.stats.set_state(LEVEL_TRANSITION,
+                    self.settings.level_transition_time)
+            self._create_fleet(self.stats.level + 1, chunked=True)
+
+    def _begin_next_level(self):
+        """Set up the next level once the level transition is over."""
+        # Destroy existing bullets and create new fleet. Increase the level,
+        # the speed and prep the level image.
+        self.bullets.empty()
+        self.alien_bullets.empty()
+        self.shields.empty()
+        # Finish the fleet if the transition was too short to build it.
+        self._build_fleet()
+        self._initiate_shields(self.settings.no_shields)
+        self.stats.level += 1
+        self.settings.set_level(self.stats.level)
+        # Draw the first shot at the fire rate of the new level.
+        self.fire_scheduler.reset()
+        self.sb.prep_level()
+        # The shields are new, so redraw the whole screen.
+        self.renderer.invalidate()
+
+    def _update_aliens(self, dt):
         """
         Check if the fleet is at an edge,
         then update the positions of all aliens in the fleet.
         """
         self._check_fleet_edges()
-        self.aliens.update()
+        if self.fleet:
+            self.fleet.update(dt)
+        else:
+            self.aliens.update(dt)
 
         # Look for alien-ship collisions.
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self._check_aliens_hit_ship():
             self._ship_hit()
 
         # Look for aliens hitting the bottom of the screen.
         self._check_aliens_bottom()
 
         # Fire allien bullets at random
-        self._alien_fire_bullets()
+        self._alien_fire_bullets(dt)
+
+    def _check_aliens_hit_ship(self):
+        """Return True if any alien collides with the ship."""
+        if self.fleet:
+            return len(self.fleet.collide_rect(self.ship.rect)) > 0
+        return pygame.sprite.spritecollideany(self.ship, self.aliens)
 
-    def _alien_fire_bullets(self):
+    def _alien_fire_bullets(self, dt):
         """Fire alien bullets with random intervals"""
-        for alien in self.aliens:
-            if randint(0, self.settings.alien_fire_rate) == 50:
-                new_alien_bullet = Bullet(self)
-                new_alien_bullet.rect.midtop = alien.rect.midbottom
-                new_alien_bullet.y = new_alien_bullet.rect.y
-                self.alien_bullets.add(new_alien_bullet)
+        shots = self.fire_scheduler.shots(len(self.aliens), dt)
+        if not shots:
+            return
+
+        if self.fleet:
+            self.fleet.sync_rects()
+        aliens = self.aliens.sprites()
+        for _ in range(shots):
+            alien = self.rng.choice(aliens)
+            self.alien_bullets.spawn(alien.rect.midbottom)
 
     def _ship_hit(self):
         """Respond to the ship being hit by an alien"""
+        # Only the first hit in a tick counts.
+        if self.stats.state != PLAYING:
+            return
+
+        self.stats.ship_hits += 1
         if self.stats.ship_left > 0:
             # Decrement ships left and update scoreboard.
             self.stats.ship_left -= 1
             self.sb.prep_ships()
 
-            # Get rid of any remaining aliens and bullets and recenter ship.
-            self._Reset_aliens_bullets_ship()
-
-            # Pause.
-            sleep(0.5)
+            # Pause on the hit; the fleet is reset when the pause ends.
+            self.stats.set_state(RESPAWNING, self.settings.respawn_time)
         else:
-            # Set game state to inactive.
-            self.stats.game_active = False
-            # Set the settings to default medium settings.
-            self.settings.initialize_dynamic_medium_settings()
-            # Show the mouse cursor.
-            pygame.mouse.set_visible(True)
+            self.stats.set_state(GAME_OVER, self.settings.game_over_time)
+            # Put the finished game on the leaderboard.
+            self.highscores.record_game(self.stats.score, self.stats.level,
+                    self.settings.difficulty)
+
+    def _check_replay_profile(self):
+        """Stop recording if the profile of the game was edited."""
+        if self.replay and (self.replay.profile_hash
+                != self.settings.profiles[self.replay.difficulty].digest):
+            # The replay could never play the game back.
+            print("Stopped recording the replay: the {} profile "
+                    "changed".format(self.replay.difficulty), file=sys.stderr)
+            self.replay = None
+
+    def _save_replay(self):
+        """Write the replay of the game that just ended, if any."""
+        if not self.replay:
+            return
+        self.replay.finish(self.stats)
+        replay_dir = os.path.join(self.settings.data_dir,
+                self.settings.replay_dir)
+        os.makedirs(replay_dir, exist_ok=True)
+        self.replay.save(os.path.join(replay_dir, "replay-{}.aireplay".format(
+                time.strftime("%Y%m%d-%H%M%S"))))
+        self.replay = None
+
+    def _show_menu(self):
+        """End the game and return to the menu."""
+        self._save_replay()
+        self.stats.set_state(MENU)
+        # Set the settings to default medium settings.
+        self.settings.initialize_dynamic_medium_settings()
+        # Show the mouse cursor.
+        pygame.mouse.set_visible(True)
+        # Draw the menu on top of the last frame.
+        self.renderer.invalidate()
 
     def _check_aliens_bottom(self):
         """Check if any aliens have reached the bottom of the screen."""
+        if self.fleet:
+            if self.fleet.reached_bottom():
+                self._ship_hit()
+            return
+
         screen_rect = self.screen.get_rect()
         for alien in self.aliens.sprites():
             if alien.rect.bottom >= screen_rect.bottom:
@@ -334,64 +595,53 @@ class AlienInvasion:
                 self._ship_hit()
                 break
 
-    def _create_fleet(self):
-        """Create the fleet of aliens"""
-        # Create an alien and find the number of aliens in a row.
-        # Spacing between each alien is equal to one alien width.
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        available_space_x = self.settings.screen_width - (2 * alien_width)
-        # Determine the number of aliens fit in one row.
-        number_aliens_x = available_space_x // (2 * alien_width)
-
-        # Determine the number of aliens that fit on the screen.
-        ship_height = self.ship.rect.height
-        available_space_y = (self.settings.screen_height - 
-                                (3 * alien_height) - ship_height)
-        number_rows = available_space_y // (2 * alien_height)
-
-        # Create the full fleet of aliens.
-        for row_number in range(number_rows):
-            for alien_number in range(number_aliens_x):
-                self._create_alien(alien_number, row_number)
-
-    def _create_alien(self, alien_number, row_number):
-        """Create an alien and place it in the row."""
-        alien = Alien(self)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien_height + 2 * alien.rect.height * row_number
-        self.aliens.add(alien)
+    def _create_fleet(self, level, chunked=False):
+        """
+        Create the fleet of aliens for level. A chunked fleet is only
+        queued here and built a few aliens per tick by _build_fleet().
+        """
+        formations = self.settings.formations
+        template = self.layout.fleet_template(
+                formations[(level - 1) % len(formations)],
+                self.assets.image("alien.bmp").get_size(),
+                self.ship.rect.height)
+        self.fleet_queue = list(template.positions)
+        if not chunked:
+            self._build_fleet()
+
+    def _build_fleet(self, count=None):
+        """Create up to count of the queued aliens, or all of them."""
+        if not self.fleet_queue:
+            return
+        if count is None:
+            count = len(self.fleet_queue)
+        for x, y in self.fleet_queue[:count]:
+            self.aliens.spawn(x, y)
+        del self.fleet_queue[:count]
+
+        if self.fleet and not self.fleet_queue:
+            self.fleet.rebuild()
 
     def _initiate_shields(self, number_of_rows):
         """Initiate the shields"""
+        shield_size = (self.settings.shield_width, self.settings.shield_height)
+        for position in self.layout.shield_positions(shield_size,
+                self.ship.rect.height, number_of_rows):
+            self._create_shield(position)
+
+    def _create_shield(self, position):
+        """Create a shield with its top left corner at position"""
         shield = Shield(self)
-        shield_width, shield_height = shield.rect.size
-        # Calculate the number of space available.
-        available_space_x = (self.screen.get_rect().width - (2 * shield_width))
-        number_shields = available_space_x // (3 * shield_width)
-
-        # Set up two rows of shields
-        for column_number in range(number_shields):
-            for row_number in range(number_of_rows):
-                self._create_shield(row_number, column_number)
-                
-    def _create_shield(self, row_number, column_number):
-        """Create a shield and place it at the correct position"""
-        shield = Shield(self)
-        shield_width, shield_height = shield.rect.size
-        screen_width = self.screen.get_rect().width
-        # Determine the x-location of the shield
-        shield.rect.x = column_number * (screen_width // 3) + screen_width /3
-        #shield_width + 4 * shield_width * column_number
-        # Determine the y-location of the shields
-        shield.rect.y = (self.screen.get_rect().height - 
-                (2 * self.ship.rect.height + 2 * shield_height * row_number))
+        shield.rect.topleft = position
         self.shields.add(shield)
 
     def _check_fleet_edges(self):
         """Respond appropiately if any aliens have reached an edge"""
+        if self.fleet:
+            if self.fleet.check_edges():
+                self._change_fleet_direction()
+            return
+
         for alien in self.aliens.sprites():
             if alien.check_edges():
                 self._change_fleet_direction()
@@ -399,24 +649,24 @@ class AlienInvasion:
 
     def _change_fleet_direction(self):
         """Drop the entire fleet and change the fleet's direction"""
-        for alien in self.aliens.sprites():
-            alien.rect.y += self.settings.fleet_drop_speed
+        if self.fleet:
+            self.fleet.drop(self.settings.fleet_drop_speed)
+        else:
+            for alien in self.aliens.sprites():
+                alien.rect.y += self.settings.fleet_drop_speed
         self.settings.fleet_direction *= -1
 
-    def _draw_ship_aliens_bullets_shields(self):
-        """Draw the moving objects: ship, aliens, bullets, shields."""
+    def _draw_ship_aliens_bullets(self):
+        """Draw the moving objects: ship, aliens, bullets."""
         # Draw the ship.
         self.ship.blitme()
-        # Draw the ship's bullets.
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-        # Draw the aliens.
-        self.aliens.draw(self.screen)
-        # Draw the alien's bullets.
-        for bullet in self.alien_bullets.sprites():
-            bullet.draw_bullet()
-        for shield in self.shields.sprites():
-            shield.draw_shield()
+        # The sprites of each group share an image, so every group is
+        #   drawn in a single blits() call: the ship's bullets, the aliens
+        #   and the alien's bullets.
+        self.renderer.draw_batch(self.bullets.image, self.bullets)
+        self.renderer.draw_batch(self.aliens.image, self.aliens)
+        self.renderer.draw_batch(self.alien_bullets.image,
+                self.alien_bullets)
 
     def _draw_buttons(self):
         """Draw the buttons on the screen when game is not active."""
@@ -426,16 +676,39 @@ class AlienInvasion:
             self.medium_button.draw_button()
             self.hard_button.draw_button()
 
+    def _drawn_rects(self):
+        """Return the rects of everything drawn in this frame."""
+        rects = [self.ship.rect]
+        for group in (self.bullets, self.aliens, self.alien_bullets):
+            rects.extend(sprite.rect for sprite in group)
+        if self.profiler.overlay_rect:
+            rects.append(self.profiler.overlay_rect)
+        if not self.stats.game_active:
+            for button in (self.play_button, self.easy_button,
+                    self.medium_button, self.hard_button):
+                rects.append(button.rect)
+        return rects
+
     def _update_screen(self):
-        """Update images on the screen, and flip to the new screen."""
-        self.screen.fill(self.settings.bg_color)
-        self._draw_ship_aliens_bullets_shields()
-        # Draw the score information.
-        self.sb.show_score()
+        """Redraw the changed parts of the screen and update them."""
+        # The menu is static, so skip the frame unless something changed
+        #   or the profiler overlay is updating.
+        if (not self.stats.game_active and not self.renderer.has_changes()
+                and not self.profiler.show_overlay):
+            return
+
+        # Bring the alien rects up to date with the fleet arrays.
+        if self.fleet:
+            self.fleet.sync_rects()
+
+        # Erase the previous frame and draw the moving objects.
+        self.renderer.clear()
+        self._draw_ship_aliens_bullets()
         # Draw the play button if the game is inactive.
         self._draw_buttons()
-        # Loop the update screen.
-        pygame.display.flip()
+        self.profiler.draw_overlay()
+        # Update the erased and drawn parts of the screen.
+        self.renderer.present(self._drawn_rects())
 
 if __name__ == "__main__":
     #Make a game instance, and run the game.
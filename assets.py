@@ -0,0 +1,56 @@
+import os
+from time import perf_counter
+
+import pygame
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+class Assets:
+    """A class to load every game image once and share it between sprites."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.images = {}
+        self.fonts = {}
+        # Seconds spent loading and converting each image.
+        self.load_times = {}
+
+    def image(self, filename, alpha=False):
+        """Return the surface for filename, loading it on first use."""
+        image = self.images.get(filename)
+        if image is None:
+            start = perf_counter()
+            image = pygame.image.load(os.path.join(IMAGE_DIR, filename))
+            # Match the display's pixel format so blits need no conversion.
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha() if alpha else image.convert()
+            self.load_times[filename] = perf_counter() - start
+            self.images[filename] = image
+        return image
+
+    def font(self, size):
+        """Return pygame's default font at size, loading it only once."""
+        font = self.fonts.get(size)
+        if font is None:
+            # Font(None) is what SysFont(None) falls back to, without
+            #   scanning every font installed on the system first.
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def memory_used(self):
+        """Return the number of bytes held by the cached surfaces."""
+        return sum(image.get_pitch() * image.get_height()
+                for image in self.images.values())
+
+    def report(self):
+        """Return a short summary of load times and memory use."""
+        lines = []
+        for filename, load_time in self.load_times.items():
+            image = self.images[filename]
+            lines.append("{}: {}x{}, {:.2f} ms".format(filename,
+                    image.get_width(), image.get_height(), load_time * 1000))
+        lines.append("{} images, {:,} bytes, {:.2f} ms total".format(
+                len(self.images), self.memory_used(),
+                sum(self.load_times.values()) * 1000))
+        return "\n".join(lines)
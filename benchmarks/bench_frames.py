@@ -0,0 +1,199 @@
+"""Frame-time regression benchmarks for fixed game scenarios.
+
+Every scenario runs a seeded headless game with the scripted sweeping
+bot for a fixed number of ticks, drawing a frame after every tick. It
+reports the p50 and p95 update and render times per frame, the best
+of --repeat runs, then runs again under tracemalloc for the memory
+churn per frame (bytes a frame allocates, even if it frees them again)
+and the peak memory. Results are compared to a stored baseline; the
+script exits with status 1 if any figure is more than --tolerance and
+more than its floor worse. The floors keep sub-millisecond timings
+from failing on scheduler noise.
+
+Run from the repository root:
+    python benchmarks/bench_frames.py
+    python benchmarks/bench_frames.py --scenario bullet_storm
+    python benchmarks/bench_frames.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+BASELINE_FILE = os.path.join(BENCH_DIR, "frames_baseline.json")
+
+from alien_invasion import AlienInvasion
+from headless import sweeping_bot
+
+def full_fleet(ai_game):
+    """Level 1 with the full starting fleet."""
+
+def bullet_storm(ai_game):
+    """The aliens fire a hundred times more often than on hard."""
+    ai_game.settings.alien_fire_rate = 2.0
+    ai_game.fire_scheduler.reset()
+
+def level_20(ai_game):
+    """The speed, points and fire rate of level 20."""
+    ai_game.settings.set_level(20)
+    ai_game.stats.level = 20
+    ai_game.sb.prep_level()
+
+def many_shields(ai_game):
+    """Eight rows of shields in every column."""
+    ai_game.shields.empty()
+    ai_game._initiate_shields(8)
+
+SCENARIOS = {scenario.__name__: scenario for scenario in (full_fleet,
+        bullet_storm, level_20, many_shields)}
+
+# The results checked against the baseline, with the scale and unit
+#   they are reported in, and how much worse than the baseline they
+#   may get regardless of the tolerance, in seconds or bytes.
+CHECKS = (("update_p50", 1000, "ms", 0.1e-3),
+        ("update_p95", 1000, "ms", 0.3e-3),
+        ("render_p50", 1000, "ms", 0.1e-3),
+        ("render_p95", 1000, "ms", 0.3e-3),
+        ("churn_per_frame", 1 / 1024, "KiB", 256),
+        ("peak_memory", 1 / 1024, "KiB", 4096))
+TIMINGS = ("update_p50", "update_p95", "render_p50", "render_p95")
+
+def start_scenario(setup, seed):
+    """Return a headless game that is set up for the scenario."""
+    ai_game = AlienInvasion(headless=True, seed=seed)
+    ai_game._start_game(seed=seed)
+    setup(ai_game)
+    return ai_game
+
+def play(ai_game, ticks, update_times=None, render_times=None,
+        memory=None):
+    """
+    Play ticks ticks, optionally timing the update and render. With
+    tracemalloc running, memory gets the total churn of all frames and
+    the peak of the traced memory.
+    """
+    time_step = ai_game.settings.time_step
+    for tick in range(ticks):
+        # Lives never run out, so the game over screen never shows.
+        ai_game.stats.ship_left = ai_game.settings.ship_limit
+        for event in sweeping_bot(ai_game, tick):
+            ai_game._handle_event(event)
+        if memory is not None:
+            tracemalloc.reset_peak()
+            in_use = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        ai_game._poll_controls()
+        ai_game._tick(time_step)
+        updated = perf_counter()
+        ai_game._update_screen()
+        rendered = perf_counter()
+        if update_times is not None:
+            update_times.append(updated - start)
+            render_times.append(rendered - updated)
+        if memory is not None:
+            # Running totals; a list of every frame would itself show
+            #   up in the traced memory.
+            peak = tracemalloc.get_traced_memory()[1]
+            memory["churn"] += peak - in_use
+            memory["peak"] = max(memory["peak"], peak)
+
+def percentile(samples, fraction):
+    """Return the given percentile of samples."""
+    samples = sorted(samples)
+    return samples[round((len(samples) - 1) * fraction)]
+
+def run_scenario(setup, ticks, seed, repeat):
+    """Return the timing and memory results of one scenario."""
+    # An untimed run first, so the first scenario doesn't pay for a
+    #   cold start. Noise only ever makes a run slower, so the best
+    #   timed run is kept.
+    play(start_scenario(setup, seed), ticks)
+    timings = {}
+    for _ in range(repeat):
+        update_times = []
+        render_times = []
+        play(start_scenario(setup, seed), ticks, update_times,
+                render_times)
+        for key, value in (("update_p50", percentile(update_times, 0.5)),
+                ("update_p95", percentile(update_times, 0.95)),
+                ("render_p50", percentile(render_times, 0.5)),
+                ("render_p95", percentile(render_times, 0.95))):
+            timings[key] = min(timings.get(key, value), value)
+
+    # Memory is measured in a second run; tracemalloc skews timings.
+    #   Churn is what a frame allocates on top of the memory in use
+    #   when it starts, even if it frees it again before it ends; the
+    #   net change in allocated blocks would hide that.
+    ai_game = start_scenario(setup, seed)
+    memory = {"churn": 0, "peak": 0}
+    tracemalloc.start()
+    play(ai_game, ticks, memory=memory)
+    tracemalloc.stop()
+
+    return dict(timings, churn_per_frame=memory["churn"] / ticks,
+            peak_memory=memory["peak"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS),
+            action="append", help="run only this scenario")
+    parser.add_argument("--ticks", type=int, default=2400)
+    parser.add_argument("--repeat", type=int, default=5,
+            help="timed runs per scenario; the best one counts")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+            help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    print("{:<14} {:>10} {:>10} {:>10} {:>10} {:>12} {:>10}".format(
+            "scenario", "update p50", "update p95", "render p50",
+            "render p95", "churn KiB", "peak KiB"))
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], args.ticks, args.seed,
+                args.repeat)
+        results[name] = result
+        print("{:<14} {:>7.3f} ms {:>7.3f} ms {:>7.3f} ms {:>7.3f} ms "
+                "{:>12.2f} {:>10.0f}".format(name,
+                *(result[key] * 1000 for key in TIMINGS),
+                result["churn_per_frame"] / 1024,
+                result["peak_memory"] / 1024))
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baseline, f, indent=4, sort_keys=True)
+        print("Baseline written to {}".format(BASELINE_FILE))
+        return
+
+    try:
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print("No baseline yet; run with --update-baseline.")
+        return
+
+    failed = False
+    for name, result in results.items():
+        for key, scale, unit, floor in CHECKS:
+            expected = baseline.get(name, {}).get(key)
+            if expected and result[key] > max(expected * (1
+                    + args.tolerance), expected + floor):
+                print("REGRESSION: {} {} is {:.3f} {}, baseline "
+                        "{:.3f} {}".format(name, key, result[key] * scale,
+                        unit, expected * scale, unit))
+                failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
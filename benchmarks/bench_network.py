@@ -0,0 +1,88 @@
+"""Bandwidth and serialization cost of streaming games to spectators.
+
+Every scenario of bench_frames.py is played by the sweeping bot with a
+spectator server on the loopback interface and one spectator client.
+Reports the size of a full snapshot, the mean bytes sent per tick with
+delta encoding, the bandwidth at the game's tick rate, and the mean
+time to capture, encode and decode a snapshot.
+
+Run from the repository root:
+    python benchmarks/bench_network.py
+    ALIEN_INVASION_RESOLUTION=3840x2160 python benchmarks/bench_network.py
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter, sleep
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_frames import SCENARIOS, start_scenario
+from headless import sweeping_bot
+from snapshot import encode
+from spectator import SpectatorServer, SpectatorClient
+
+def run_scenario(setup, ticks, seed):
+    """Stream one scenario over loopback and return its results."""
+    ai_game = start_scenario(setup, seed)
+    server = SpectatorServer(ai_game, host="127.0.0.1", port=0)
+    client = SpectatorClient("127.0.0.1", server.start())
+    while not server.clients:
+        sleep(0.001)
+    full_size = len(encode(server.capture.capture()))
+
+    # The game publishes every tick itself once spectators is set;
+    #   here it's done by hand to time the capture.
+    time_step = ai_game.settings.time_step
+    publish_time = 0.0
+    for tick in range(ticks):
+        for event in sweeping_bot(ai_game, tick):
+            ai_game._handle_event(event)
+        if not ai_game.stats.game_active:
+            break
+        ai_game._poll_controls()
+        ai_game._tick(time_step)
+        start = perf_counter()
+        server.publish()
+        publish_time += perf_counter() - start
+        client.receive()
+
+    # Let the last snapshots arrive.
+    sleep(0.1)
+    client.receive()
+    client.close()
+    server.stop()
+
+    published = tick + 1
+    return {"full": full_size,
+            "per_tick": server.bytes_sent / published,
+            "kbps": server.bytes_sent / published * 8
+                    * ai_game.settings.ticks_per_second / 1000,
+            "received": client.snapshots_received / published,
+            "capture": publish_time / published,
+            "encode": server.encode_time / server.messages_sent,
+            "decode": client.decode_time / client.snapshots_received}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS),
+            action="append", help="run only this scenario")
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("{:>14} {:>10} {:>10} {:>10} {:>9} {:>11} {:>10} {:>10}".format(
+            "scenario", "full B", "B/tick", "kbit/s", "received",
+            "capture us", "encode us", "decode us"))
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], args.ticks, args.seed)
+        print("{:>14} {:>10} {:>10.1f} {:>10.1f} {:>8.0%} {:>11.1f} "
+                "{:>10.1f} {:>10.1f}".format(name, result["full"],
+                result["per_tick"], result["kbps"], result["received"],
+                result["capture"] * 1e6, result["encode"] * 1e6,
+                result["decode"] * 1e6))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare drawing sprites one call at a time with batched blits().
+
+For several entity counts, fills a headless game with aliens, bullets
+and shields and draws them both ways: the old path with one draw.rect()
+or blit() call per sprite, and the batched path with one blits() call
+per group. Reports the draw calls and the median time per frame.
+
+Run from the repository root:
+    python benchmarks/bench_render.py
+"""
+
+import argparse
+import os
+import sys
+from random import Random
+from statistics import median
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# A dummy display, so images get converted to the screen format like
+#   they are in the game.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from alien_invasion import AlienInvasion
+
+def populate(ai_game, count, seed):
+    """Place count aliens, count bullets of each kind and count shields."""
+    rng = Random(seed)
+    width, height = ai_game.screen.get_size()
+    for group in (ai_game.aliens, ai_game.bullets, ai_game.alien_bullets,
+            ai_game.shields):
+        group.empty()
+    for _ in range(count):
+        ai_game.aliens.spawn(rng.randrange(width), rng.randrange(height))
+        for pool in (ai_game.bullets, ai_game.alien_bullets):
+            pool.spawn((rng.randrange(width), rng.randrange(height)))
+        ai_game._create_shield((rng.randrange(width), rng.randrange(height)))
+
+def draw_per_sprite(ai_game):
+    """Draw every sprite with its own call; return the number of calls."""
+    for bullet in ai_game.bullets.sprites():
+        bullet.draw_bullet()
+    ai_game.aliens.draw(ai_game.screen)
+    for bullet in ai_game.alien_bullets.sprites():
+        bullet.draw_bullet()
+    for shield in ai_game.shields.sprites():
+        shield.draw_shield()
+    return (len(ai_game.bullets) + len(ai_game.aliens)
+            + len(ai_game.alien_bullets) + len(ai_game.shields))
+
+def draw_batched(ai_game):
+    """Draw every group in one blits() call; return the number of calls."""
+    renderer = ai_game.renderer
+    renderer.draw_batch(ai_game.bullets.image, ai_game.bullets)
+    renderer.draw_batch(ai_game.aliens.image, ai_game.aliens)
+    renderer.draw_batch(ai_game.alien_bullets.image, ai_game.alien_bullets)
+    ai_game.screen.blits([(shield.image, shield.rect)
+            for shield in ai_game.shields], False)
+    return 4
+
+def measure(ai_game, draw, repeat):
+    """Return the draw calls and median seconds of one frame."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        calls = draw(ai_game)
+        times.append(perf_counter() - start)
+    return calls, median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+",
+            default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    ai_game = AlienInvasion(seed=1)
+    print("{:>8} {:>12} {:>12} {:>12} {:>12} {:>8}".format("entities",
+            "calls before", "ms before", "calls after", "ms after",
+            "speedup"))
+    for count in args.counts:
+        populate(ai_game, count, count)
+        calls_before, before = measure(ai_game, draw_per_sprite, args.repeat)
+        calls_after, after = measure(ai_game, draw_batched, args.repeat)
+        print("{:>8} {:>12} {:>12.3f} {:>12} {:>12.3f} {:>7.1f}x".format(
+                count, calls_before, before * 1000, calls_after,
+                after * 1000, before / after))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Measure startup time and compare it to a stored baseline.
+
+Reports the time to import alien_invasion and the time from creating
+AlienInvasion to the first full frame on the display, each as the
+median of several fresh processes. Exits with status 1 when either
+is more than --tolerance slower than the baseline.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from statistics import median
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_FILE = os.path.join(BENCH_DIR, "startup_baseline.json")
+
+# Runs in a fresh interpreter so nothing is imported or cached yet.
+CHILD = """
+import json, os, sys
+from time import perf_counter
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, {repo!r})
+start = perf_counter()
+import alien_invasion
+imported = perf_counter()
+ai_game = alien_invasion.AlienInvasion()
+ai_game._update_screen()
+first_frame = perf_counter()
+print(json.dumps({{"import": imported - start,
+        "first_frame": first_frame - imported}}))
+"""
+
+def measure(runs):
+    """Return the median import and first-frame times in seconds."""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c",
+                CHILD.format(repo=REPO_DIR)], capture_output=True, text=True,
+                check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: median(result[key] for result in results)
+            for key in ("import", "first_frame")}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+            help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    timings = measure(args.runs)
+    for key, seconds in timings.items():
+        print("{:<12} {:8.1f} ms".format(key, seconds * 1000))
+
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(timings, f, indent=4)
+        print("Baseline written to {}".format(BASELINE_FILE))
+        return
+
+    try:
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print("No baseline yet; run with --update-baseline.")
+        return
+
+    failed = False
+    for key, seconds in timings.items():
+        limit = baseline[key] * (1 + args.tolerance)
+        if seconds > limit:
+            print("REGRESSION: {} took {:.1f} ms, baseline {:.1f} ms".format(
+                    key, seconds * 1000, baseline[key] * 1000))
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 import pygame
-from pygame.sprite import Sprite
+from pygame.sprite import Sprite, Group
 
 class Bullet(Sprite):
-    """A class to manage bullets fired from the ship"""
+    """A base class to manage bullets, recycled through a BulletPool"""
 
     def __init__(self, ai_game):
-        """Create a bullet object at the ship's current position"""
+        """Create a bullet object at (0, 0); the pool places it."""
         super().__init__()
         self.screen = ai_game.screen
         self.settings = ai_game.settings
@@ -18,19 +18,87 @@ class Bullet(Sprite):
         #Store the bullet's position as a decimal value.
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Move the bullet up the screen"""
+    def place(self, midtop):
+        """Move the bullet to a new starting position."""
+        self.rect.midtop = midtop
+        self.y = float(self.rect.y)
+
+    def draw_bullet(self):
+        """Draw the bullet to the screen."""
+        pygame.draw.rect(self.screen, self.color, self.rect)
+
+class ShipBullet(Bullet):
+    """A class to manage bullets fired from the ship"""
+
+    def update(self, dt):
+        """Move the bullet up the screen over dt seconds"""
         #Update the decimal position of the bullet.
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.bullet_speed * dt
         #Update the rect position.
         self.rect.y = self.y
 
-    def update_alien_bullet(self):
-        """Move the alien's bullet down the screen"""
-        self.y += self.settings.alien_bullet_speed
+    def offscreen(self):
+        """Return True once the bullet has passed the top of the screen."""
+        return self.rect.bottom <= 0
+
+class AlienBullet(Bullet):
+    """A class to manage bullets fired by the aliens"""
+
+    def update(self, dt):
+        """Move the alien's bullet down the screen over dt seconds"""
+        self.y += self.settings.alien_bullet_speed * dt
         self.rect.y = self.y
 
-    def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def offscreen(self):
+        """Return True once the bullet has passed the bottom of the screen."""
+        return self.rect.top >= self.screen.get_height()
+
+class BulletPool(Group):
+    """
+    A group of bullets that recycles them instead of allocating one per
+    shot. Bullets that leave the group, whether killed in a collision,
+    culled off screen or emptied at a new level, go back to the pool.
+    """
+
+    def __init__(self, ai_game, bullet_class, size):
+        """Preallocate size bullets of bullet_class."""
+        super().__init__()
+        self.ai_game = ai_game
+        self.bullet_class = bullet_class
+        self.free = [bullet_class(ai_game) for _ in range(size)]
+
+        # All bullets look alike, so they are drawn from one precolored
+        #   image instead of a draw.rect() call each.
+        settings = ai_game.settings
+        self.image = pygame.Surface((settings.bullet_width,
+                settings.bullet_height))
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert()
+        self.image.fill(settings.bullet_color)
+
+    def spawn(self, midtop):
+        """Take a bullet from the pool, place it and add it to the group."""
+        if self.free:
+            bullet = self.free.pop()
+        else:
+            # The pool ran dry; it keeps the extra bullet from now on.
+            bullet = self.bullet_class(self.ai_game)
+        bullet.place(midtop)
+        self.add(bullet)
+        return bullet
+
+    def remove_internal(self, sprite):
+        """Return a bullet to the pool when it leaves the group."""
+        super().remove_internal(sprite)
+        self.free.append(sprite)
 
+    def update(self, dt):
+        """Move the bullets and recycle the ones that left the screen."""
+        offscreen = []
+        # Iterate the group's dict directly instead of a copy of it.
+        for bullet in self.spritedict:
+            bullet.update(dt)
+            if bullet.offscreen():
+                offscreen.append(bullet)
+        for bullet in offscreen:
+            bullet.kill()
@@ -11,7 +11,7 @@ class Button:
 		self.width, self.height = 200, 50
 		self.button_color = (0, 255, 0)
 		self.text_color = (255, 255, 255)
-		self.font = pygame.font.SysFont(None, 48)
+		self.text_cache = ai_game.text_cache
 
 		# Build the button's rect object and center it.
 		self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -22,7 +22,7 @@ class Button:
 
 	def _prep_msg(self, msg):
 		"""Turn message into a rendered image and center text on the button"""
-		self.msg_image = self.font.render(msg, True, self.text_color,
+		self.msg_image = self.text_cache.render(msg, self.text_color,
 					self.button_color)
 		self.msg_image_rect = self.msg_image.get_rect()
 		self.msg_image_rect.center = self.rect.center
@@ -30,7 +30,7 @@ class Button:
 	def change_button_color(self, msg, color):
 		"""Change the button color"""
 		self.button_color = color
-		self.msg_image = self.font.render(msg, True, self.text_color,
+		self.msg_image = self.text_cache.render(msg, self.text_color,
 					color)
 
 	def draw_button(self):
@@ -0,0 +1,64 @@
+"""
+Check group collisions by scanning rect lists in C.
+
+pygame.sprite.groupcollide() calls a Python function for every pair of
+sprites. groupcollide() here tests every sprite of the smaller group
+against the rects of the larger one with Rect.collidelistall(), so the
+pairs are tested in C. It gives the same results as pygame's.
+
+A spatial hash was tried and dropped: building it in Python costs more
+than all the scans of a tick, and only pays off once both groups have
+hundreds of sprites, which the game never has (see
+benchmarks/bench_collisions.py).
+"""
+
+def _scan_pairs(small, large, large_first):
+    """
+    Return {sprite: [hit sprites]} for small against large, testing
+    each sprite of small against every rect of large. The keys come
+    from large if large_first is set.
+    """
+    sprites = large.sprites()
+    rects = [sprite.rect for sprite in sprites]
+    pairs = {}
+    for sprite in small.sprites():
+        for index in sprite.rect.collidelistall(rects):
+            if large_first:
+                pairs.setdefault(sprites[index], []).append(sprite)
+            else:
+                pairs.setdefault(sprite, []).append(sprites[index])
+    return pairs
+
+def groupcollide(group_a, group_b, dokill_a, dokill_b):
+    """
+    Work like pygame.sprite.groupcollide, including the order of
+    the results and which sprite of group_a a killed sprite of
+    group_b counts for.
+    """
+    a_is_small = len(group_a) <= len(group_b)
+    if a_is_small:
+        pairs = _scan_pairs(group_a, group_b, False)
+    else:
+        pairs = _scan_pairs(group_b, group_a, True)
+    if not pairs:
+        return {}
+
+    collisions = {}
+    killed = set()
+    for sprite in group_a.sprites():
+        hits = pairs.get(sprite)
+        if not hits:
+            continue
+        # pygame kills the hits of each sprite of group_a before it
+        #   tests the next one.
+        if dokill_b:
+            hits = [other for other in hits if other not in killed]
+            if not hits:
+                continue
+            killed.update(hits)
+            for other in hits:
+                other.kill()
+        collisions[sprite] = hits
+        if dokill_a:
+            sprite.kill()
+    return collisions
@@ -0,0 +1,136 @@
+import pygame
+
+from replay import MOVE_LEFT, MOVE_RIGHT, FIRE
+
+# Actions that last as long as their key is held.
+HELD_ACTIONS = ("left", "right", "fire")
+
+# Frequent events the game never reads, dropped by SDL before they
+#   reach Python. Held keys and sticks are polled instead. (Blocking
+#   everything else with set_blocked(None) costs over 10 ms at startup.)
+BLOCKED_EVENTS = (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP,
+        pygame.MOUSEWHEEL, pygame.KEYUP, pygame.TEXTINPUT,
+        pygame.TEXTEDITING, pygame.JOYAXISMOTION, pygame.JOYBALLMOTION,
+        pygame.JOYHATMOTION, pygame.JOYBUTTONUP, pygame.FINGERMOTION,
+        pygame.FINGERDOWN, pygame.FINGERUP)
+
+class Controls:
+    """
+    A class to turn keyboard and gamepad input into actions.
+
+    Held actions (moving and firing) are polled once per tick and
+    become the same input bits a replay records. Presses that arrive
+    as events are remembered until the next poll, so a tap shorter
+    than a tick still counts. Other actions, such as quitting, are
+    returned by handle_event() as soon as their key is pressed.
+    """
+
+    def __init__(self, ai_game):
+        """Build the lookup tables from the keymap in the settings."""
+        self.settings = ai_game.settings
+        # A headless game has no devices to poll; its scripted key
+        #   events are all the input there is.
+        self.poll_devices = not ai_game.headless
+
+        self.keys = {}
+        for action, names in self.settings.keymap.items():
+            for name in names:
+                self.keys[pygame.key.key_code(name)] = action
+        self.held_keys = [(key, action) for key, action in self.keys.items()
+                if action in HELD_ACTIONS]
+        self.buttons = {}
+        for action, buttons in self.settings.gamepad_buttons.items():
+            for button in buttons:
+                self.buttons[button] = action
+        self.joysticks = {}
+
+        # Actions held down at the last poll, and pressed since then.
+        self.held = set()
+        self.presses = set()
+        # Ticks until held fire shoots again.
+        self.cooldown_ticks = round(self.settings.fire_cooldown
+                * self.settings.ticks_per_second)
+        self.cooldown = 0
+
+        if self.poll_devices:
+            pygame.joystick.init()
+            pygame.event.set_blocked(BLOCKED_EVENTS)
+
+    def reset(self):
+        """Forget pending presses and the fire cooldown."""
+        self.presses.clear()
+        self.cooldown = 0
+
+    def handle_event(self, event):
+        """
+        Record a key or gamepad event. Returns the action of a pressed
+        key or button that isn't held during play, or None.
+        """
+        if event.type == pygame.JOYDEVICEADDED:
+            joystick = pygame.joystick.Joystick(event.device_index)
+            self.joysticks[joystick.get_instance_id()] = joystick
+            return None
+        if event.type == pygame.JOYDEVICEREMOVED:
+            self.joysticks.pop(event.instance_id, None)
+            return None
+
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            action = self.keys.get(event.key)
+        elif event.type in (pygame.JOYBUTTONDOWN, pygame.JOYBUTTONUP):
+            action = self.buttons.get(event.button)
+        else:
+            return None
+        if action is None:
+            return None
+        pressed = event.type in (pygame.KEYDOWN, pygame.JOYBUTTONDOWN)
+        if action not in HELD_ACTIONS:
+            return action if pressed else None
+
+        if pressed:
+            self.presses.add(action)
+            self.held.add(action)
+        else:
+            self.held.discard(action)
+        return None
+
+    def _poll_held(self):
+        """Return the held actions of the keyboard and the gamepads."""
+        keys = pygame.key.get_pressed()
+        held = {action for key, action in self.held_keys if keys[key]}
+
+        deadzone = self.settings.gamepad_deadzone
+        for joystick in self.joysticks.values():
+            x = joystick.get_axis(0) if joystick.get_numaxes() else 0.0
+            if joystick.get_numhats():
+                x = joystick.get_hat(0)[0] or x
+            if x <= -deadzone:
+                held.add("left")
+            elif x >= deadzone:
+                held.add("right")
+            buttons = joystick.get_numbuttons()
+            for button, action in self.buttons.items():
+                if (action in HELD_ACTIONS and button < buttons
+                        and joystick.get_button(button)):
+                    held.add(action)
+        return held
+
+    def poll(self):
+        """Return the input bits of this tick."""
+        if self.poll_devices:
+            self.held = self._poll_held()
+        active = self.held | self.presses
+
+        bits = 0
+        if "left" in active:
+            bits |= MOVE_LEFT
+        if "right" in active:
+            bits |= MOVE_RIGHT
+        # A new press fires at once; holding fire repeats it after
+        #   every cooldown.
+        self.cooldown = max(self.cooldown - 1, 0)
+        if "fire" in self.presses or ("fire" in self.held
+                and not self.cooldown):
+            bits |= FIRE
+            self.cooldown = self.cooldown_ticks
+        self.presses.clear()
+        return bits
@@ -0,0 +1,35 @@
+class FireScheduler:
+    """
+    A class to decide when the fleet fires without rolling for every alien.
+
+    Every alien fires alien_fire_rate shots per second on average, so the
+    fleet as a whole fires at that rate per alien-second. Instead of
+    rolling once per alien per tick, the scheduler draws the number of
+    alien-seconds until the next shot from an exponential distribution
+    with the same rate and counts it down by the number of living aliens
+    times the length of each tick. The fire rate doesn't depend on the
+    tick rate.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize the scheduler and draw the first shot."""
+        self.settings = ai_game.settings
+        self.rng = ai_game.rng
+        self.reset()
+
+    def reset(self):
+        """Draw a new countdown, e.g. after the fire rate changed."""
+        self.countdown = self._draw()
+
+    def _draw(self):
+        """Return the number of alien-seconds until the next shot."""
+        return self.rng.expovariate(self.settings.alien_fire_rate)
+
+    def shots(self, alien_count, dt):
+        """Return the number of shots the fleet fires in a tick of dt."""
+        self.countdown -= alien_count * dt
+        shots = 0
+        while self.countdown <= 0:
+            shots += 1
+            self.countdown += self._draw()
+        return shots
@@ -0,0 +1,131 @@
+import pygame
+
+# pygame imports NumPy anyway when it's installed (for surfarray), so
+#   importing it here costs nothing extra at startup.
+try:
+    import numpy as np
+except ImportError:
+    # The array fleet is optional; the game falls back to plain sprites.
+    np = None
+
+def array_fleet_available():
+    """Return True if NumPy is installed."""
+    return np is not None
+
+class ArrayFleet:
+    """
+    A class to move the alien fleet as NumPy arrays.
+    The alien sprites stay in the aliens group for drawing, but their
+    rects only get synced from the arrays when they are needed.
+    """
+
+    def __init__(self, ai_game):
+        """Start with an empty fleet."""
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+        self.aliens = ai_game.aliens
+
+        self.sprites = []
+        self.x = np.zeros(0)
+        self.y = np.zeros(0, dtype=int)
+        self.width = np.zeros(0, dtype=int)
+        self.height = np.zeros(0, dtype=int)
+        self.alive = np.zeros(0, dtype=bool)
+        self.rects_stale = False
+
+    def rebuild(self):
+        """Copy the aliens currently in the group into the arrays."""
+        self.sprites = self.aliens.sprites()
+        self.x = np.array([alien.x for alien in self.sprites], dtype=float)
+        self.y = np.array([alien.rect.y for alien in self.sprites], dtype=int)
+        self.width = np.array([alien.rect.width for alien in self.sprites],
+                dtype=int)
+        self.height = np.array([alien.rect.height for alien in self.sprites],
+                dtype=int)
+        self.alive = np.ones(len(self.sprites), dtype=bool)
+        self.rects_stale = False
+
+    def _left(self):
+        """Return the rect x-positions, rounded the way Rect rounds."""
+        return np.floor(self.x + 0.5).astype(int)
+
+    def update(self, dt):
+        """Move the whole fleet to the right or left over dt seconds."""
+        self.x += self.settings.alien_speed * self.settings.fleet_direction * dt
+        self.rects_stale = True
+
+    def check_edges(self):
+        """Return True if any living alien is at the edge of the screen."""
+        left = self._left()
+        at_edge = (left + self.width >= self.screen_rect.right) | (left <= 0)
+        return bool(np.any(at_edge & self.alive))
+
+    def drop(self, distance):
+        """Move the whole fleet down by distance pixels."""
+        self.y += distance
+        self.rects_stale = True
+
+    def reached_bottom(self):
+        """Return True if any living alien reached the bottom of the screen."""
+        bottom = self.y + self.height
+        return bool(np.any((bottom >= self.screen_rect.bottom) & self.alive))
+
+    def collide_rect(self, rect):
+        """Return the indices of the living aliens that overlap rect."""
+        left = self._left()
+        overlap = ((left < rect.right) & (left + self.width > rect.left)
+                & (self.y < rect.bottom) & (self.y + self.height > rect.top))
+        return np.flatnonzero(overlap & self.alive)
+
+    def rect(self, index):
+        """Return the current rect of the alien at index."""
+        left = int(np.floor(self.x[index] + 0.5))
+        return pygame.Rect(left, int(self.y[index]), int(self.width[index]),
+                int(self.height[index]))
+
+    def plow(self, shields):
+        """
+        Let the aliens tear the shield pixels they overlap out of the
+        shields; the aliens that hit any pixels die.
+        """
+        for shield in shields.sprites():
+            indices = self.collide_rect(shield.rect).tolist()
+            self.kill([index for index in indices
+                    if shields.plow(shield, self.rect(index))])
+
+    def kill(self, indices):
+        """Remove the aliens at indices from the fleet and the group."""
+        for index in indices:
+            if self.alive[index]:
+                self.alive[index] = False
+                self.sprites[index].kill()
+
+    def groupcollide(self, group, dokill):
+        """
+        Collide every sprite in group with the fleet and kill the aliens
+        that got hit. Returns a dict like pygame.sprite.groupcollide.
+        """
+        collisions = {}
+        for sprite in group.sprites():
+            indices = self.collide_rect(sprite.rect)
+            if len(indices):
+                collisions[sprite] = [self.sprites[index]
+                        for index in indices]
+                self.kill(indices)
+                if dokill:
+                    sprite.kill()
+        return collisions
+
+    def sync_rects(self):
+        """Copy the array positions into the rects of the living aliens."""
+        if not self.rects_stale:
+            return
+        x = self.x.tolist()
+        left = self._left().tolist()
+        y = self.y.tolist()
+        for index in np.flatnonzero(self.alive).tolist():
+            alien = self.sprites[index]
+            alien.x = x[index]
+            alien.rect.x = left[index]
+            alien.rect.y = y[index]
+        self.rects_stale = False
@@ -0,0 +1,54 @@
+"""
+Fleet formations, described as data.
+
+A formation places aliens in slots two alien widths apart, in rows two
+alien heights apart, filling the space above the ship. The options of
+a formation change that grid:
+
+    row_shifts: shifts that cycle over the rows, in alien widths.
+    taper: slots dropped from both ends of each next row.
+
+New formations only need a new entry in FORMATIONS.
+"""
+
+FORMATIONS = {
+    "grid": {},
+    # Every other row sits half a slot to the right.
+    "staggered": {"row_shifts": (0, 1)},
+    # Every row is a slot shorter at both ends than the one above it.
+    "wedge": {"taper": 1},
+}
+
+class FormationTemplate:
+    """A class to hold the alien positions of one formation."""
+
+    def __init__(self, name, positions, rows, columns):
+        """Store the top left corners of the aliens, row by row."""
+        self.name = name
+        self.positions = tuple(positions)
+        # Size of the grid the formation was cut from, in slots.
+        self.rows = rows
+        self.columns = columns
+
+def build_template(name, screen_rect, alien_size, ship_height):
+    """Return the template of formation name for the screen."""
+    options = FORMATIONS[name]
+    row_shifts = options.get("row_shifts", (0,))
+    taper = options.get("taper", 0)
+
+    alien_width, alien_height = alien_size
+    # Spacing between each alien is equal to one alien width.
+    available_space_x = screen_rect.width - 2 * alien_width
+    columns = available_space_x // (2 * alien_width)
+    # Leave room above the ship for it to shoot the fleet.
+    available_space_y = screen_rect.height - 3 * alien_height - ship_height
+    rows = available_space_y // (2 * alien_height)
+
+    positions = []
+    for row_number in range(rows):
+        shift = row_shifts[row_number % len(row_shifts)] * alien_width
+        first = taper * row_number
+        for alien_number in range(first, columns - first):
+            positions.append((alien_width + 2 * alien_width * alien_number
+                    + shift, alien_height + 2 * alien_height * row_number))
+    return FormationTemplate(name, positions, rows, columns)
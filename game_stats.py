@@ -1,4 +1,9 @@
-import json
+# Game states. Every state but the menu counts as an active game.
+MENU = "menu"
+PLAYING = "playing"
+RESPAWNING = "respawning"
+LEVEL_TRANSITION = "level_transition"
+GAME_OVER = "game_over"
 
 class GameStats:
 	"""Track statistics for Alien Invasion"""
@@ -6,10 +11,11 @@ class GameStats:
 	def __init__(self, ai_game):
 		"""Initialize statistics."""
 		self.settings = ai_game.settings
+		self.highscores = ai_game.highscores
 		self.reset_stats()
 
-		# Start Alien Invasion in an inactive state.
-		self.game_active = False
+		# Start Alien Invasion in the menu.
+		self.set_state(MENU)
 
 		# High score should never be reset.
 		self._get_highscore()
@@ -19,12 +25,19 @@ class GameStats:
 		self.ship_left = self.settings.ship_limit
 		self.score = 0
 		self.level = 1
+		# Times the ship got hit, including the one that ended the game.
+		self.ship_hits = 0
+
+	def set_state(self, state, duration=0.0):
+		"""Switch to state; timed states end after duration seconds."""
+		self.state = state
+		self.state_timer = duration
+
+	@property
+	def game_active(self):
+		"""Return True unless the menu is showing."""
+		return self.state != MENU
 
 	def _get_highscore(self):
-		"""Read the current highscore. If there is none, set it to 0."""
-		filename = "highscore.json"
-		try:
-			with open(filename, "r") as f:
-				self.high_score = json.load(f)
-		except FileNotFoundError:
-			self.high_score = 0
\ No newline at end of file
+		"""Read the current highscore. If there is none, it is 0."""
+		self.high_score = self.highscores.high_score
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Run batches of Alien Invasion games without a window.
+
+Example:
+    python headless.py --games 100 --seed 1
+"""
+
+import argparse
+from time import perf_counter
+
+import pygame
+
+from alien_invasion import AlienInvasion
+
+def key_event(event_type, key):
+    """Return a scripted KEYDOWN or KEYUP event for key."""
+    return pygame.event.Event(event_type, key=key)
+
+def scheduled_script(schedule):
+    """Turn a {tick: [events]} mapping into a script callable."""
+    def script(ai_game, tick):
+        return schedule.get(tick, ())
+    return script
+
+def sweeping_bot(ai_game, tick):
+    """A simple scripted player: sweep left and right and keep firing."""
+    events = []
+    ship = ai_game.ship
+    if ship.rect.right >= ai_game.screen.get_rect().right - 5:
+        events += [key_event(pygame.KEYUP, pygame.K_RIGHT),
+                key_event(pygame.KEYDOWN, pygame.K_LEFT)]
+    elif ship.rect.left <= 5 or not (ship.moving_left or ship.moving_right):
+        events += [key_event(pygame.KEYUP, pygame.K_LEFT),
+                key_event(pygame.KEYDOWN, pygame.K_RIGHT)]
+    if tick % 10 == 0:
+        events.append(key_event(pygame.KEYDOWN, pygame.K_SPACE))
+    return events
+
+def run_headless_game(seed=None, script=sweeping_bot, max_ticks=None,
+        difficulty="medium"):
+    """Play one headless game and return its final GameStats."""
+    ai_game = AlienInvasion(headless=True, seed=seed)
+    getattr(ai_game, "_{}_clicked".format(difficulty))()
+    return ai_game.run_headless(script, max_ticks)
+
+def main():
+    """Run a batch of seeded games and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=None)
+    parser.add_argument("--difficulty", default="medium",
+            choices=("easy", "medium", "hard"))
+    parser.add_argument("--assets", action="store_true",
+            help="report the load time and memory of the images")
+    args = parser.parse_args()
+
+    if args.assets:
+        print(AlienInvasion(headless=True).assets.report())
+
+    start = perf_counter()
+    for game_number in range(args.games):
+        stats = run_headless_game(args.seed + game_number,
+                max_ticks=args.max_ticks, difficulty=args.difficulty)
+        print("seed {}: score {}, level {}".format(args.seed + game_number,
+                stats.score, stats.level))
+    elapsed = perf_counter() - start
+    print("{} games in {:.2f} s ({:.0f} games per minute)".format(
+            args.games, elapsed, args.games / elapsed * 60))
+
+if __name__ == "__main__":
+    main()
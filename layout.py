@@ -0,0 +1,53 @@
+from formations import build_template
+
+class Layout:
+    """
+    A class to place the game objects in logical screen coordinates.
+    Everything is laid out for the logical resolution in the settings;
+    pygame scales that resolution once to the window or display.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize the layout for the game's logical screen."""
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+        # Fleet formation templates, by formation and sprite sizes.
+        self.templates = {}
+
+    def fleet_template(self, name, alien_size, ship_height):
+        """Return the template of a fleet formation, built only once."""
+        key = (name, alien_size, ship_height)
+        template = self.templates.get(key)
+        if template is None:
+            template = build_template(name, self.screen_rect, alien_size,
+                    ship_height)
+            self.templates[key] = template
+        return template
+
+    def shield_positions(self, shield_size, ship_height, number_of_rows):
+        """Return the top left corners of the shields, spread evenly."""
+        shield_width, shield_height = shield_size
+        available_space_x = self.screen_rect.width - 2 * shield_width
+        number_shields = available_space_x // (3 * shield_width)
+
+        positions = []
+        for column_number in range(number_shields):
+            centerx = (self.screen_rect.width * (column_number + 1)
+                    // (number_shields + 1))
+            for row_number in range(number_of_rows):
+                positions.append((centerx - shield_width // 2,
+                        self.screen_rect.height - 2 * ship_height
+                        - 2 * shield_height * row_number))
+        return positions
+
+    def place_button_row(self, buttons):
+        """
+        Line buttons up from the left to the right edge of the screen,
+        at the height given by settings.button_row_y.
+        """
+        top = int(self.screen_rect.height * self.settings.button_row_y)
+        for index, button in enumerate(buttons):
+            free_space = self.screen_rect.width - button.rect.width
+            button.rect.x = free_space * index // max(len(buttons) - 1, 1)
+            button.rect.y = top
+            button.msg_image_rect.center = button.rect.center
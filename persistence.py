@@ -0,0 +1,157 @@
+import json
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+
+def write_atomic(path, data):
+    """
+    Write data as JSON so that path always holds either the old or the
+    new contents: write a temporary file next to it, fsync it and
+    rename it over path.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json",
+            dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    # Make the rename itself durable where directories can be synced.
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+def _is_score(value):
+    """Return True if value is a whole number that can be a score."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+class HighScoreStore:
+    """
+    A class to keep the high score and a leaderboard on disk.
+    Writes happen on a background thread, so saving never stalls a frame.
+    """
+
+    def __init__(self, settings, enabled=True):
+        """Load the scores from the data directory in the settings."""
+        self.settings = settings
+        self.enabled = enabled
+        self.path = os.path.join(settings.data_dir, settings.highscore_file)
+
+        self.high_score = 0
+        self.leaderboard = []
+        self._load()
+
+        self._last_saved = self._snapshot()
+        self._last_checkpoint = time.monotonic()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def _load(self):
+        """
+        Read the scores; a missing or unreadable file, or one that holds
+        neither scores nor a bare high score, means no scores. Leaderboard
+        entries without a score are dropped.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print("Could not load the high scores: {}".format(e),
+                        file=sys.stderr)
+            return
+
+        if _is_score(data):
+            # Older versions stored the bare high score.
+            self.high_score = data
+        elif isinstance(data, dict):
+            high_score = data.get("high_score", 0)
+            if _is_score(high_score):
+                self.high_score = high_score
+            leaderboard = data.get("leaderboard", [])
+            if isinstance(leaderboard, list):
+                self.leaderboard = [entry for entry in leaderboard
+                        if isinstance(entry, dict)
+                        and _is_score(entry.get("score"))]
+
+    def _snapshot(self):
+        """Return the data to write, as a fresh copy."""
+        return {"high_score": self.high_score,
+                "leaderboard": [dict(entry) for entry in self.leaderboard]}
+
+    def update_high_score(self, high_score):
+        """Remember a new high score; it is written at the next save."""
+        self.high_score = max(self.high_score, high_score)
+
+    def record_game(self, score, level, difficulty):
+        """Add a finished game to the leaderboard and save it."""
+        self.update_high_score(score)
+        self.leaderboard.append({"player": self.settings.player_name,
+                "score": score, "level": level, "difficulty": difficulty,
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        self.leaderboard.sort(key=lambda entry: entry["score"], reverse=True)
+        del self.leaderboard[self.settings.leaderboard_size:]
+        self.save()
+
+    def checkpoint(self):
+        """Save if the scores changed and the checkpoint interval passed."""
+        now = time.monotonic()
+        if now - self._last_checkpoint >= self.settings.checkpoint_interval:
+            self._last_checkpoint = now
+            self.save()
+
+    def save(self):
+        """Hand the current scores to the writer thread if they changed."""
+        snapshot = self._snapshot()
+        if not self.enabled or snapshot == self._last_saved:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop,
+                    name="highscore-writer", daemon=True)
+            self._thread.start()
+        self._queue.put(snapshot)
+
+    def _write_loop(self):
+        """Write snapshots until close() sends None."""
+        done = False
+        while not done:
+            snapshot = self._queue.get()
+            done = snapshot is None
+            # Only the newest of several queued snapshots matters.
+            while not self._queue.empty():
+                item = self._queue.get()
+                if item is None:
+                    done = True
+                else:
+                    snapshot = item
+            if snapshot is not None:
+                # A failed write is reported and retried at the next save.
+                try:
+                    os.makedirs(os.path.dirname(self.path) or ".",
+                            exist_ok=True)
+                    write_atomic(self.path, snapshot)
+                except OSError as e:
+                    print("Could not save the high scores: {}".format(e),
+                            file=sys.stderr)
+                else:
+                    self._last_saved = snapshot
+
+    def close(self):
+        """Save any changes and wait for the writer thread to finish."""
+        self.save()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
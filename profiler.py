@@ -0,0 +1,135 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+class _PhaseTimer:
+    """A reusable context manager that adds its run time to one phase."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.current[self.name] += perf_counter() - self.start
+
+class FrameProfiler:
+    """A class to time every phase of a frame and report on it."""
+
+    phases = ("events", "ship", "bullets", "aliens", "render")
+    groups = ("bullets", "alien_bullets", "aliens", "shields")
+
+    def __init__(self, ai_game):
+        """Initialize rolling windows for every phase."""
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        window = self.settings.profiler_window
+        self.samples = {name: deque(maxlen=window)
+                for name in self.phases + ("frame",)}
+        self.current = dict.fromkeys(self.phases, 0.0)
+        self.timers = {name: _PhaseTimer(self, name) for name in self.phases}
+        # One row per frame, for dumping to a trace file.
+        self.trace = deque(maxlen=self.settings.profiler_trace_length)
+        self.frame_number = 0
+
+        # The overlay is hidden until toggled and only re-rendered
+        #   every few frames.
+        self.show_overlay = False
+        self.overlay_image = None
+        self.overlay_rect = None
+        self.font = None
+
+    def phase(self, name):
+        """Return a context manager that times one phase of the frame."""
+        return self.timers[name]
+
+    def end_frame(self):
+        """Store this frame's timings and sprite counts."""
+        frame_time = sum(self.current.values())
+        row = {"frame": self.frame_number, "frame_time": frame_time}
+        for name, seconds in self.current.items():
+            self.samples[name].append(seconds)
+            row[name] = seconds
+            self.current[name] = 0.0
+        self.samples["frame"].append(frame_time)
+        for group in self.groups:
+            row[group + "_count"] = len(getattr(self.ai_game, group))
+        self.trace.append(row)
+        self.frame_number += 1
+
+        if (self.show_overlay and self.frame_number
+                % self.settings.profiler_overlay_interval == 0):
+            self._prep_overlay()
+
+    def percentiles(self, name):
+        """Return the p50, p95 and p99 of a phase in seconds."""
+        samples = sorted(self.samples[name])
+        if not samples:
+            return 0.0, 0.0, 0.0
+        last = len(samples) - 1
+        return tuple(samples[round(last * fraction)]
+                for fraction in (0.5, 0.95, 0.99))
+
+    def toggle_overlay(self):
+        """Show or hide the on-screen overlay."""
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self._prep_overlay()
+        else:
+            self.overlay_image = None
+            self.overlay_rect = None
+
+    def _prep_overlay(self):
+        """Render the timing table into the overlay image."""
+        if self.font is None:
+            self.font = self.ai_game.assets.font(24)
+        lines = ["{:<8} {:>7} {:>7} {:>7}".format("ms", "p50", "p95", "p99")]
+        for name in self.phases + ("frame",):
+            lines.append("{:<8} {:>7.2f} {:>7.2f} {:>7.2f}".format(name,
+                    *(seconds * 1000 for seconds in self.percentiles(name))))
+        lines.append(", ".join("{} {}".format(group,
+                len(getattr(self.ai_game, group))) for group in self.groups))
+        assets = self.ai_game.assets
+        lines.append("images {}, {:,} KiB, loaded in {:.1f} ms".format(
+                len(assets.images), assets.memory_used() // 1024,
+                sum(assets.load_times.values()) * 1000))
+
+        images = [self.font.render(line, True, (255, 255, 255))
+                for line in lines]
+        width = max(image.get_width() for image in images) + 10
+        height = sum(image.get_height() for image in images) + 10
+        self.overlay_image = pygame.Surface((width, height))
+        y = 5
+        for image in images:
+            self.overlay_image.blit(image, (5, y))
+            y += image.get_height()
+        self.overlay_rect = self.overlay_image.get_rect()
+        self.overlay_rect.bottomleft = self.screen.get_rect().bottomleft
+
+    def draw_overlay(self):
+        """Draw the overlay if it is shown."""
+        if self.overlay_image:
+            self.screen.blit(self.overlay_image, self.overlay_rect)
+
+    def dump(self, filename):
+        """Write the trace to a .json file, or to CSV for anything else."""
+        rows = list(self.trace)
+        with open(filename, "w", newline="") as f:
+            if filename.endswith(".json"):
+                summary = {name: dict(zip(("p50", "p95", "p99"),
+                        self.percentiles(name))) for name in self.samples}
+                assets = self.ai_game.assets
+                summary["assets"] = {"load_times": assets.load_times,
+                        "memory_used": assets.memory_used()}
+                json.dump({"summary": summary, "frames": rows}, f)
+            elif rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
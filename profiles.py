@@ -0,0 +1,128 @@
+"""
+Load the difficulty profiles from a JSON file.
+
+Every profile gives the level 1 value of the settings that change from
+level to level, plus the settings that stay the same. level_scales
+holds the factor each leveled setting changes by per level; a profile
+can override it with level_scales of its own. The values of every
+level are computed once into a lookup table when the file is loaded.
+Speeds are in pixels per second, and alien_fire_rate is the shots
+every alien fires per second on average.
+"""
+
+import hashlib
+import json
+import os
+
+from formations import FORMATIONS
+
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        "profiles.json")
+
+# Settings that change per level, and how their values are stored.
+LEVELED = {"ship_speed": float, "bullet_speed": float, "alien_speed": float,
+        "alien_points": int, "alien_fire_rate": float}
+# The difficulties the menu offers; every profile file must have them.
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Parsed files by path, with the modification stamp they were read at.
+_cache = {}
+
+class DifficultyProfile:
+    """A class to hold one difficulty and its per-level lookup table."""
+
+    def __init__(self, name, no_shields, formations, levels):
+        """Store the fixed settings and the table of leveled settings."""
+        self.name = name
+        self.no_shields = no_shields
+        self.formations = formations
+        # levels[0] holds the leveled settings of level 1, and so on.
+        self.levels = levels
+        # A 64-bit hash of everything above, so a replay can tell
+        #   whether it is played with the profile it was recorded with.
+        data = json.dumps([name, no_shields, formations, levels],
+                sort_keys=True)
+        self.digest = int.from_bytes(hashlib.blake2b(data.encode(),
+                digest_size=8).digest(), "little")
+
+    def level(self, level):
+        """Return the leveled settings of level; the last level repeats."""
+        return self.levels[min(level, len(self.levels)) - 1]
+
+def _check(condition, message):
+    """Raise a ValueError with message unless condition holds."""
+    if not condition:
+        raise ValueError("bad difficulty profile: " + message)
+
+def _positive_number(value):
+    """Return True if value is an int or float greater than 0."""
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and value > 0)
+
+def _build_profile(name, data, level_count, level_scales):
+    """Validate the profile called name and build its lookup table."""
+    _check(isinstance(data, dict), "{} is not an object".format(name))
+    scales = dict(level_scales)
+    scales.update(data.get("level_scales", {}))
+    for key in LEVELED:
+        _check(_positive_number(data.get(key)),
+                "{}.{} must be a positive number".format(name, key))
+        _check(_positive_number(scales.get(key)),
+                "level_scales.{} must be a positive number".format(key))
+
+    no_shields = data.get("no_shields")
+    _check(isinstance(no_shields, int) and not isinstance(no_shields, bool)
+            and no_shields >= 0,
+            "{}.no_shields must be a whole number >= 0".format(name))
+    formations = data.get("formations")
+    _check(isinstance(formations, list) and formations
+            and all(formation in FORMATIONS for formation in formations),
+            "{}.formations must list formations from {}".format(name,
+            ", ".join(sorted(FORMATIONS))))
+
+    levels = []
+    for level in range(level_count):
+        levels.append({key: kind(data[key] * scales[key] ** level)
+                for key, kind in LEVELED.items()})
+    return DifficultyProfile(name, no_shields, tuple(formations), levels)
+
+def parse_profiles(data):
+    """Validate parsed profile data and return the profiles by name."""
+    _check(isinstance(data, dict), "the file must hold an object")
+    level_count = data.get("levels")
+    _check(isinstance(level_count, int) and level_count >= 1,
+            "levels must be a whole number >= 1")
+    level_scales = data.get("level_scales", {})
+    _check(isinstance(level_scales, dict), "level_scales is not an object")
+    profiles = data.get("profiles")
+    _check(isinstance(profiles, dict), "profiles is not an object")
+    for name in DIFFICULTIES:
+        _check(name in profiles, "the {} profile is missing".format(name))
+
+    return {name: _build_profile(name, profile, level_count, level_scales)
+            for name, profile in profiles.items()}
+
+def file_stamp(path):
+    """Return what changes when the file at path is rewritten."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def load_profiles(path):
+    """
+    Return the profiles in the file at path. The parsed result is kept,
+    so every later game in the same process loads it for free until
+    the file changes.
+    """
+    stamp = file_stamp(path)
+    cached = _cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    with open(path) as f:
+        try:
+            data = json.load(f)
+        except ValueError as e:
+            raise ValueError("bad difficulty profile: {}".format(e)) from e
+    profiles = parse_profiles(data)
+    _cache[path] = (stamp, profiles)
+    return profiles
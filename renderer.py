@@ -0,0 +1,91 @@
+import pygame
+
+class DirtyRenderer:
+    """
+    A class to update only the parts of the screen that changed.
+
+    Everything that holds still between frames (the background color,
+    the shields and the scoreboard) is composed into a cached static
+    layer, which is only redrawn where a shield or scoreboard image
+    changed. Each frame erases the moving sprites by copying the static
+    layer over last frame's rects, and only the touched rects are sent
+    to the display.
+    """
+
+    def __init__(self, ai_game):
+        """Create the static layer used to erase the previous frame."""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.shields = ai_game.shields
+        self.sb = ai_game.sb
+        # A headless game draws off screen and has no display to update.
+        self.headless = ai_game.headless
+
+        self.static_layer = pygame.Surface(self.screen.get_size())
+        if pygame.display.get_surface() is not None:
+            self.static_layer = self.static_layer.convert()
+
+        # Rects drawn in the previous frame, erased before the next one.
+        self.last_rects = []
+        # Rects where the static layer changed in this frame.
+        self.changed_rects = []
+        # Start with a full redraw so the first frame covers the window.
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw and update the whole screen on the next frame."""
+        self.full_redraw = True
+        # The full redraw covers every rect recorded so far. Dropping them
+        #   here also keeps the lists short in games that never draw.
+        self.shields.take_dirty_rects()
+        self.sb.take_dirty_rects()
+
+    def has_changes(self):
+        """Return True if the next frame would differ from the last one."""
+        return (self.full_redraw or bool(self.shields.dirty_rects)
+                or bool(self.sb.dirty_rects))
+
+    def draw_batch(self, image, sprites):
+        """Blit image at the rect of every sprite, in a single call."""
+        self.screen.blits([(image, sprite.rect) for sprite in sprites],
+                False)
+
+    def _compose(self, rect):
+        """Redraw the static layer inside rect."""
+        layer = self.static_layer
+        layer.set_clip(rect)
+        layer.fill(self.settings.bg_color)
+        layer.blits([(shield.image, shield.rect) for shield in self.shields
+                if shield.rect.colliderect(rect)], False)
+        self.sb.show_score(layer)
+        layer.set_clip(None)
+
+    def clear(self):
+        """Update the static layer and erase the previous frame."""
+        changed_rects = self.shields.take_dirty_rects()
+        changed_rects += self.sb.take_dirty_rects()
+
+        if self.full_redraw:
+            self._compose(self.screen.get_rect())
+            self.screen.blit(self.static_layer, (0, 0))
+            self.changed_rects = []
+            return
+
+        for rect in changed_rects:
+            self._compose(rect)
+        for rect in self.last_rects + changed_rects:
+            self.screen.blit(self.static_layer, rect, rect)
+        self.changed_rects = changed_rects
+
+    def present(self, rects):
+        """Send the erased and the newly drawn rects to the display."""
+        rects = [rect.copy() for rect in rects]
+        if self.headless:
+            self.full_redraw = False
+        elif self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.last_rects + self.changed_rects
+                    + rects)
+        self.last_rects = rects
@@ -0,0 +1,204 @@
+"""Record games tick by tick and play them back exactly.
+
+A replay stores the game's seed and difficulty, plus one input byte per
+tick, run-length encoded. Since the simulation runs on a fixed
+timestep and takes every random number from the seeded generator,
+feeding the same bytes back reproduces the game exactly. The profile
+of the difficulty can be edited (see profiles.py), so a replay also
+stores a hash of it and only plays back with the same profile.
+
+Example:
+    python replay.py replays/replay-20261018-120000.aireplay --realtime
+"""
+
+import argparse
+import struct
+import time
+
+# Input bits for a single tick.
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+FIRE = 4
+
+MAGIC = b"AIRP"
+VERSION = 2
+DIFFICULTIES = ("easy", "medium", "hard")
+# Magic, version, seed, difficulty, profile hash, ticks per second,
+#   tick count, final score and final level.
+HEADER = struct.Struct("<4sBQBQHIQI")
+
+def _run_length(ticks, index):
+    """Return how many ticks from index on hold the same input byte."""
+    end = index + 1
+    while end < len(ticks) and ticks[end] == ticks[index]:
+        end += 1
+    return end - index
+
+def _encode_runs(ticks):
+    """Run-length encode ticks as (input byte, LEB128 run length) pairs."""
+    data = bytearray()
+    index = 0
+    while index < len(ticks):
+        run = _run_length(ticks, index)
+        data.append(ticks[index])
+        index += run
+        while True:
+            byte = run & 0x7F
+            run >>= 7
+            data.append(byte | 0x80 if run else byte)
+            if not run:
+                break
+    return bytes(data)
+
+def _decode_runs(data):
+    """
+    Turn run-length encoded pairs back into one byte per tick. Raises
+    ValueError if the data ends in the middle of a pair.
+    """
+    ticks = bytearray()
+    position = 0
+    while position < len(data):
+        value = data[position]
+        position += 1
+        run = shift = 0
+        while True:
+            if position == len(data):
+                raise ValueError("replay is truncated")
+            byte = data[position]
+            position += 1
+            run |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        ticks.extend(bytes((value,)) * run)
+    return ticks
+
+class Replay:
+    """A class to hold one recorded game."""
+
+    def __init__(self, seed, difficulty, profile_hash, ticks_per_second,
+            ticks=None):
+        """
+        Initialize a replay; profile_hash is the digest of the
+        difficulty's profile, and ticks holds one input byte per tick.
+        """
+        self.seed = seed
+        self.difficulty = difficulty
+        self.profile_hash = profile_hash
+        self.ticks_per_second = ticks_per_second
+        self.ticks = bytearray() if ticks is None else ticks
+        # Filled in when the game ends, to check playback against.
+        self.final_score = 0
+        self.final_level = 0
+
+    def record(self, bits):
+        """Add the input of one tick."""
+        self.ticks.append(bits)
+
+    def finish(self, stats):
+        """Remember how the game ended."""
+        self.final_score = stats.score
+        self.final_level = stats.level
+
+    def to_bytes(self):
+        """Return the replay in its compact binary format."""
+        header = HEADER.pack(MAGIC, VERSION, self.seed,
+                DIFFICULTIES.index(self.difficulty), self.profile_hash,
+                self.ticks_per_second, len(self.ticks), self.final_score,
+                self.final_level)
+        return header + _encode_runs(self.ticks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Read a replay written by to_bytes(). Raises ValueError if data
+        isn't a replay or is cut short.
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("replay is truncated")
+        (magic, version, seed, difficulty, profile_hash, ticks_per_second,
+                tick_count, final_score, final_level) = HEADER.unpack_from(
+                data)
+        if (magic != MAGIC or version != VERSION
+                or difficulty >= len(DIFFICULTIES)):
+            raise ValueError("not an Alien Invasion replay")
+        ticks = _decode_runs(data[HEADER.size:])
+        if len(ticks) != tick_count:
+            raise ValueError("replay is truncated")
+        replay = cls(seed, DIFFICULTIES[difficulty], profile_hash,
+                ticks_per_second, ticks)
+        replay.final_score = final_score
+        replay.final_level = final_level
+        return replay
+
+    def save(self, filename):
+        """Write the replay to filename."""
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, filename):
+        """Read a replay from filename."""
+        with open(filename, "rb") as f:
+            return cls.from_bytes(f.read())
+
+def play_replay(replay, realtime=False):
+    """
+    Play replay back and return the final GameStats. At full speed
+    nothing is drawn; in real time the game window shows the replay.
+    Raises ValueError if the game can't play it back the same way.
+    """
+    # Imported here so the replay format has no pygame dependency.
+    from alien_invasion import AlienInvasion
+
+    ai_game = AlienInvasion(headless=not realtime)
+    getattr(ai_game.settings,
+            "initialize_dynamic_{}_settings".format(replay.difficulty))()
+    if ai_game.settings.ticks_per_second != replay.ticks_per_second:
+        raise ValueError("replay was recorded at a different tick rate")
+    if (ai_game.settings.profiles[replay.difficulty].digest
+            != replay.profile_hash):
+        raise ValueError("replay was recorded with a different {} "
+                "profile".format(replay.difficulty))
+    ai_game._start_game(seed=replay.seed)
+
+    time_step = ai_game.settings.time_step
+    start = time.perf_counter()
+    for tick, bits in enumerate(replay.ticks):
+        ai_game._apply_tick_input(bits)
+        ai_game._tick(time_step)
+        if realtime:
+            ai_game._check_events()
+            ai_game._update_screen()
+            # Sleep until this tick is due.
+            delay = start + (tick + 1) * time_step - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return ai_game.stats
+
+def main():
+    """Play a replay file and check it against the recorded result."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("filename")
+    parser.add_argument("--realtime", action="store_true",
+            help="show the replay in a window at normal speed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        replay = Replay.load(args.filename)
+        stats = play_replay(replay, args.realtime)
+    except ValueError as e:
+        print("Can't play {}: {}".format(args.filename, e))
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - start
+    print("{} ticks in {:.2f} s: score {}, level {}".format(
+            len(replay.ticks), elapsed, stats.score, stats.level))
+    if (stats.score, stats.level) != (replay.final_score,
+            replay.final_level):
+        print("MISMATCH: recorded score {}, level {}".format(
+                replay.final_score, replay.final_level))
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
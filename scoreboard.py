@@ -1,7 +1,4 @@
-import pygame.font
-from pygame.sprite import Group
-
-from ship import Ship
+import pygame
 
 class Scoreboard:
 	"""A class to report scoring information"""
@@ -16,7 +13,14 @@ class Scoreboard:
 
 		# Font settings for scoring information.
 		self.text_color = (30, 30, 30)
-		self.font = pygame.font.SysFont(None, 48)
+		self.text_cache = ai_game.text_cache
+
+		# Screen areas to redraw because a score image changed.
+		self.dirty_rects = []
+		self.score_rect = pygame.Rect(0, 0, 0, 0)
+		self.high_score_rect = pygame.Rect(0, 0, 0, 0)
+		self.level_rect = pygame.Rect(0, 0, 0, 0)
+		self.ship_rects = []
 
 		# Prepare the initial score images.
 		self.prep_score()
@@ -27,33 +31,43 @@ class Scoreboard:
 	def prep_score(self):
 		"""Turn the score into a rendered image."""
 		rounded_score = round(self.stats.score, -1) 
-		score_str = "{:,}".format(rounded_score)
-		self.score_image = self.font.render(score_str, True,
+		self.score_image = self.text_cache.render_number(rounded_score,
 				self.text_color, self.settings.bg_color)
 
 		# Display the score at the top right of the screen.
+		self.dirty_rects.append(self.score_rect)
 		self.score_rect = self.score_image.get_rect()
 		self.score_rect.right = self.screen_rect.right - 20
 		self.score_rect.top = 20
+		self.dirty_rects.append(self.score_rect)
 
 	def prep_high_score(self):
 		"""Turn the high score into a rendered image."""
 		high_score = round(self.stats.high_score, -1)
-		high_score_str = "{:,}".format(high_score)
-		self.high_score_image = self.font.render(high_score_str, True,
+		self.high_score_image = self.text_cache.render_number(high_score,
 				self.text_color, self.settings.bg_color)
 
 		# Center the high score at the top of the screen.
+		self.dirty_rects.append(self.high_score_rect)
 		self.high_score_rect = self.high_score_image.get_rect()
 		self.high_score_rect.centerx = self.screen_rect.centerx
 		self.high_score_rect.top = self.screen_rect.top + 20
+		self.dirty_rects.append(self.high_score_rect)
 
-	def show_score(self):
-		"""Draw scores and level and ships to the screen."""
-		self.screen.blit(self.score_image, self.score_rect)
-		self.screen.blit(self.high_score_image, self.high_score_rect)
-		self.screen.blit(self.level_image, self.level_rect)
-		self.ships.draw(self.screen)
+	def show_score(self, surface=None):
+		"""Draw scores and level and ships to the screen, or to surface."""
+		surface = surface or self.screen
+		surface.blit(self.score_image, self.score_rect)
+		surface.blit(self.high_score_image, self.high_score_rect)
+		surface.blit(self.level_image, self.level_rect)
+		for rect in self.ship_rects:
+			surface.blit(self.ship_image, rect)
+
+	def take_dirty_rects(self):
+		"""Return the dirty rects and start a new list."""
+		dirty_rects = self.dirty_rects
+		self.dirty_rects = []
+		return dirty_rects
 
 	def check_high_score(self):
 		"""Check to see if there's a new high score."""
@@ -63,20 +77,26 @@ class Scoreboard:
 
 	def prep_level(self):
 		"""Turn the level into a rendered image."""
-		level_str = str(self.stats.level)
-		self.level_image = self.font.render(level_str, True, self.text_color,
-				self.settings.bg_color)
+		self.level_image = self.text_cache.render_number(self.stats.level,
+				self.text_color, self.settings.bg_color)
 
 		# Position the level below the score
+		self.dirty_rects.append(self.level_rect)
 		self.level_rect = self.level_image.get_rect()
 		self.level_rect.right = self.score_rect.right
 		self.level_rect.top = self.score_rect.bottom + 10
+		self.dirty_rects.append(self.level_rect)
 
 	def prep_ships(self):
 		"""Show how many ships are left."""
-		self.ships = Group()
+		# Every life icon shares the cached ship image.
+		self.ship_image = self.ai_game.assets.image("ship.bmp")
+		ship_rect = self.ship_image.get_rect()
+		self.dirty_rects.extend(self.ship_rects)
+		self.ship_rects = []
 		for ship_number in range(self.stats.ship_left):
-			ship = Ship(self.ai_game)
-			ship.rect.x = 10 + ship_number * ship.rect.width
-			ship.rect.y = 10
-			self.ships.add(ship)
\ No newline at end of file
+			rect = ship_rect.copy()
+			rect.x = 10 + ship_number * rect.width
+			rect.y = 10
+			self.ship_rects.append(rect)
+		self.dirty_rects.extend(self.ship_rects)
\ No newline at end of file
@@ -1,88 +1,180 @@
+import os
+import sys
+import time
+
+from profiles import PROFILE_FILE, file_stamp, load_profiles
+
+def _resolution_from_env(default):
+    """Read a WIDTHxHEIGHT resolution from the environment, if set."""
+    value = os.environ.get("ALIEN_INVASION_RESOLUTION")
+    if not value:
+        return default
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
 class Settings:
     """A class to store all settings for Alien Invasion."""
 
     def __init__(self):
         """Initialize the game's static settings."""
-        #Screen settings
-        self.screen_width = 1200
-        self.screen_height = 800
+        #Screen settings. The game is laid out for this logical
+        #   resolution and scaled once to the window, or to the whole
+        #   display when fullscreen. Set ALIEN_INVASION_RESOLUTION to
+        #   e.g. 3840x2160 for a bigger arena.
+        self.screen_width, self.screen_height = _resolution_from_env(
+                (1200, 800))
+        self.fullscreen = os.environ.get("ALIEN_INVASION_FULLSCREEN") == "1"
+        # Height of the difficulty buttons, as a fraction of the screen.
+        self.button_row_y = 0.65
         self.bg_color = (230, 230, 230)
 
+        # Clock settings. The simulation advances in fixed steps of
+        #   time_step seconds; rendering is capped at max_fps.
+        self.ticks_per_second = 120
+        self.time_step = 1 / self.ticks_per_second
+        self.max_fps = 60
+        # Longest frame the simulation will try to catch up on.
+        self.max_frame_time = 0.25
+
+        # Score settings. High scores live in data_dir, which defaults to
+        #   the game's own directory.
+        self.data_dir = os.environ.get("ALIEN_INVASION_DATA_DIR",
+                os.path.dirname(os.path.abspath(__file__)))
+        self.highscore_file = "highscore.json"
+        self.player_name = os.environ.get("ALIEN_INVASION_PLAYER", "Player")
+        self.leaderboard_size = 10
+        # Seconds between background saves during play.
+        self.checkpoint_interval = 30
+        # Record every game to a replay file in data_dir/replay_dir; set
+        #   ALIEN_INVASION_RECORD_REPLAYS=1 to turn it on.
+        self.record_replays = os.environ.get(
+                "ALIEN_INVASION_RECORD_REPLAYS") == "1"
+        self.replay_dir = "replays"
+
+        # Controls. Every action lists its keys, named the way
+        #   pygame.key.name() spells them, and its gamepad buttons.
+        #   Rebind a key by editing its list.
+        self.keymap = {"left": ("left",), "right": ("right",),
+                "fire": ("space",), "play": ("p",), "quit": ("q",),
+                "profiler_overlay": ("f3",), "profiler_dump": ("f4",)}
+        self.gamepad_buttons = {"fire": (0,), "play": (7,)}
+        # How far a stick has to be pushed to move the ship.
+        self.gamepad_deadzone = 0.5
+        # Seconds between shots while fire is held down; every new
+        #   press fires right away.
+        self.fire_cooldown = 0.25
+
         #Ship settings
         self.ship_limit = 3
 
+        # Length of the timed game states, in seconds.
+        self.respawn_time = 0.5
+        self.level_transition_time = 0.5
+        self.game_over_time = 1.0
+
         #Bullet settings
         self.bullet_width = 3
         self.bullet_height = 15
         self.bullet_color = (60, 60, 60)
         self.bullets_allowed = 3
+        # Alien bullets preallocated at startup; the pool grows if needed.
+        self.alien_bullet_pool_size = 32
 
         #Alien settings
         self.fleet_drop_speed = 10
-        self.alien_bullet_speed = 0.3
+        # All speeds are in pixels per second.
+        self.alien_bullet_speed = 90.0
+        # Aliens created per tick while the next fleet is built during
+        #   a level transition, so big fleets don't stall one frame.
+        self.fleet_chunk_size = 64
+        # Move the fleet as NumPy arrays instead of sprite by sprite.
+        #   Needs numpy; the game falls back to sprites without it.
+        self.array_fleet = False
+
+        # Profiler settings. F3 toggles the overlay, F4 dumps the trace
+        #   to a .csv or .json file.
+        self.profiler_window = 600
+        self.profiler_trace_length = 36000
+        self.profiler_overlay_interval = 15
+        self.profiler_trace_file = "frame_trace.csv"
+
+        # Spectator server settings. Snapshots are kept for
+        #   spectator_history ticks to encode deltas against; a client
+        #   with more than spectator_buffer_limit bytes still unsent
+        #   skips ticks until it catches up.
+        self.spectator_port = 50007
+        self.spectator_history = 120
+        self.spectator_buffer_limit = 64 * 1024
 
         # Shield settings
         self.shield_width = 100
         self.shield_height = 30
         self.shield_color = (0, 0, 255)
-
-        # How quickly the game speeds up.
-        self.speedup_scale = 1.1
-
-        # How quickly the alien point values increase
-        self.score_scale = 1.5
-
-        # How quickly the fire rate increases.
-        self.fire_rate_scale = 1.05
+        # Radius of the crater a bullet chips out of a shield, in pixels.
+        self.shield_crater_radius = 5
+
+        # Difficulty profiles with the per-level values of the speeds,
+        #   points and fire rate. Edits to the file are picked up while
+        #   the game runs, checked every profile_check_interval seconds.
+        self.profile_file = os.environ.get("ALIEN_INVASION_PROFILES",
+                PROFILE_FILE)
+        self.profile_check_interval = 1.0
+        self.profiles = load_profiles(self.profile_file)
+        self._profile_stamp = file_stamp(self.profile_file)
+        self._last_profile_check = time.monotonic()
 
         self.initialize_dynamic_medium_settings()
 
-    def initialize_dynamic_medium_settings(self):
+    def initialize_dynamic_settings(self, difficulty):
         """Initialize settings that change throughout the game."""
-        self.ship_speed = 1.5
-        self.bullet_speed = 1.5
-        self.alien_speed = 0.6
-        self.alien_points = 50
-        # Based on random number pick. The higher the number the less frequent
-        # the bullets fire
-        self.alien_fire_rate = 20000
-
+        self.difficulty = difficulty
         # Fleet direction of 1 represents right; -1 represents left
         self.fleet_direction = 1
-        # Number of shields per column
-        self.no_shields = 1
+        self.set_level(1)
 
-    def initialize_dynamic_easy_settings(self):
-        """Initialize settings that change throughout the game."""
-        self.ship_speed = 1.5
-        self.bullet_speed = 1.5
-        self.alien_speed = 0.3
-        self.alien_points = 20
-        self.alien_fire_rate = 25000
+    def initialize_dynamic_medium_settings(self):
+        """Initialize the settings of the medium (default) difficulty."""
+        self.initialize_dynamic_settings("medium")
 
-        # Fleet direction of 1 represents right; -1 represents left
-        self.fleet_direction = 1
-        # Number of shields per column
-        self.no_shields = 2
+    def initialize_dynamic_easy_settings(self):
+        """Initialize the settings of the easy difficulty."""
+        self.initialize_dynamic_settings("easy")
 
     def initialize_dynamic_hard_settings(self):
-        """Initialize settings that change throughout the game."""
-        self.ship_speed = 1.5
-        self.bullet_speed = 1.5
-        self.alien_speed = 1
-        self.alien_points = 80
-        self.alien_fire_rate = 15000
+        """Initialize the settings of the hard difficulty."""
+        self.initialize_dynamic_settings("hard")
 
-        # Fleet direction of 1 represents right; -1 represents left
-        self.fleet_direction = 1
+    def set_level(self, level):
+        """Look up the speeds, points and fire rate of level."""
+        self.level = level
+        profile = self.profiles[self.difficulty]
         # Number of shields per column
-        self.no_shields = 0
-
-    def increase_speed(self):
-        """Increase speed settings and alien point values."""
-        self.ship_speed *= self.speedup_scale
-        self.bullet_speed *= self.speedup_scale
-        self.alien_speed *= self.speedup_scale
-        self.alien_fire_rate *= round(self.fire_rate_scale)
-
-        self.alien_points = int(self.alien_points * self.score_scale)
+        self.no_shields = profile.no_shields
+        # Fleet formations of the levels, repeated after the last one.
+        self.formations = profile.formations
+        for key, value in profile.level(level).items():
+            setattr(self, key, value)
+
+    def reload_if_changed(self):
+        """
+        Reload the profiles if their file changed and apply them to the
+        current level. Returns True if the settings changed. A file
+        that fails to load is reported and the old profiles are kept.
+        """
+        now = time.monotonic()
+        if now - self._last_profile_check < self.profile_check_interval:
+            return False
+        self._last_profile_check = now
+
+        try:
+            stamp = file_stamp(self.profile_file)
+            if stamp == self._profile_stamp:
+                return False
+            self._profile_stamp = stamp
+            self.profiles = load_profiles(self.profile_file)
+        except (OSError, ValueError) as e:
+            print("Keeping the old difficulty profiles: {}".format(e),
+                    file=sys.stderr)
+            return False
+        self.set_level(self.level)
+        return True
@@ -1,5 +1,5 @@
 import pygame
-from pygame.sprite import Sprite
+from pygame.sprite import Sprite, Group
 
 class Shield(Sprite):
 	"""A class to manage shields against bullets"""
@@ -15,6 +15,119 @@ class Shield(Sprite):
 		self.rect = pygame.Rect(0, 0, self.settings.shield_width,
 				self.settings.shield_height)
 
-	def draw_shield(self):
-		"""Draw the shield on the screen"""
-		pygame.draw.rect(self.screen, self.settings.shield_color, self.rect)
\ No newline at end of file
+		# The set bits of the mask are the pixels still standing; the
+		#   image shows them and is only repainted after damage. Holes
+		#   get a colorkey, which blits faster than per-pixel alpha.
+		self.mask = pygame.mask.Mask(self.rect.size, fill=True)
+		self.image = pygame.Surface(self.rect.size)
+		if pygame.display.get_surface() is not None:
+			self.image = self.image.convert()
+		self.hole_color = tuple(255 - value
+				for value in self.settings.shield_color)
+		self.image.set_colorkey(self.hole_color)
+		self.image.fill(self.settings.shield_color)
+		# Counts the changes to the mask, so copies of it can tell when
+		#   they are out of date.
+		self.version = 0
+
+	def overlap(self, mask, rect):
+		"""
+		Return the first shield pixel covered by mask placed at rect, in
+		shield coordinates, or None if the mask only covers holes.
+		"""
+		return self.mask.overlap(mask, (rect.x - self.rect.x,
+				rect.y - self.rect.y))
+
+	def erase(self, mask, offset):
+		"""Erase the pixels of mask at offset and repaint the image."""
+		self.mask.erase(mask, offset)
+		self.version += 1
+		self.mask.to_surface(self.image, setcolor=self.settings.shield_color,
+				unsetcolor=self.hole_color)
+
+	def draw_shield(self, surface=None):
+		"""Draw the shield on the screen, or on another surface"""
+		(surface or self.screen).blit(self.image, self.rect)
+
+class ShieldGroup(Group):
+	"""A group of shields that remembers where shields changed."""
+
+	def __init__(self, crater_radius):
+		"""Initialize an empty group."""
+		super().__init__()
+		self.crater_radius = crater_radius
+		# Screen areas to redraw because a shield appeared, vanished or
+		#   got damaged.
+		self.dirty_rects = []
+		# Masks are built once per size and shared by every shield.
+		self.solid_masks = {}
+		self.crater_mask = self._make_crater_mask(crater_radius)
+
+	def _make_crater_mask(self, radius):
+		"""Return a round mask with the given radius."""
+		size = 2 * radius + 1
+		surface = pygame.Surface((size, size), pygame.SRCALPHA)
+		pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius)
+		return pygame.mask.from_surface(surface)
+
+	def _solid_mask(self, size):
+		"""Return a fully set mask of size, for testing a sprite's rect."""
+		mask = self.solid_masks.get(size)
+		if mask is None:
+			mask = pygame.mask.Mask(size, fill=True)
+			self.solid_masks[size] = mask
+		return mask
+
+	def add_internal(self, sprite, layer=None):
+		"""Remember where a new shield appeared."""
+		super().add_internal(sprite, layer)
+		self.dirty_rects.append(sprite.rect.copy())
+
+	def remove_internal(self, sprite):
+		"""Remember where a shield vanished."""
+		super().remove_internal(sprite)
+		self.dirty_rects.append(sprite.rect.copy())
+
+	def _damage(self, shield, mask, offset):
+		"""Erase mask from shield at offset; remove the shield once empty."""
+		shield.erase(mask, offset)
+		if not shield.mask.count():
+			shield.kill()
+			return
+		damaged = pygame.Rect(offset, mask.get_size()).move(shield.rect.topleft)
+		self.dirty_rects.append(damaged.clip(shield.rect))
+
+	def chip(self, collisions):
+		"""
+		Take a groupcollide() result of bullets and shields, chip a crater
+		where a bullet really hits shield pixels and kill that bullet.
+		Bullets that only overlap holes fly on.
+		"""
+		for bullet, shields in collisions.items():
+			mask = self._solid_mask(bullet.rect.size)
+			for shield in shields:
+				point = shield.overlap(mask, bullet.rect)
+				if point:
+					self._damage(shield, self.crater_mask,
+							(point[0] - self.crater_radius,
+							point[1] - self.crater_radius))
+					bullet.kill()
+					break
+
+	def plow(self, shield, rect):
+		"""
+		Erase the pixels of shield under rect, e.g. of an alien that runs
+		into it. Return True if there were any.
+		"""
+		mask = self._solid_mask(rect.size)
+		if not shield.overlap(mask, rect):
+			return False
+		self._damage(shield, mask, (rect.x - shield.rect.x,
+				rect.y - shield.rect.y))
+		return True
+
+	def take_dirty_rects(self):
+		"""Return the dirty rects and start a new list."""
+		dirty_rects = self.dirty_rects
+		self.dirty_rects = []
+		return dirty_rects
@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 class Ship(Sprite):
@@ -11,8 +10,8 @@ class Ship(Sprite):
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
 
-        #Load the ship image and get its rect.
-        self.image = pygame.image.load('images/ship.bmp')
+        #Use the shared ship image and get its rect.
+        self.image = ai_game.assets.image("ship.bmp")
         self.rect = self.image.get_rect()
 
         #Start each new ship at the bottom center of the screen.
@@ -25,13 +24,13 @@ class Ship(Sprite):
         self.moving_right = False
         self.moving_left = False
 
-    def update(self):
+    def update(self, dt):
         """Update the ship's position based on the movement flag"""
         #Update the ship's x value, not the rect.
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         #Update rect object from self.x.
         self.rect.x = self.x
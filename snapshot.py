@@ -0,0 +1,324 @@
+"""Capture the game state each tick and delta-encode it for the network.
+
+A snapshot holds the stats, the ship, the positions of the aliens and
+both kinds of bullets, and the shields with their damage masks. The
+server encodes each snapshot against the last one a client
+acknowledged, and the client applies it to its copy of that one.
+
+Layout, little-endian:
+    header: tick (u32), baseline tick (u32, NO_BASELINE for none),
+        section flags (u8). Only the changed sections follow, in the
+        order of the flags.
+    stats: score (u64), level (u16), ships left (u8), game state (u8),
+        ship x (i16).
+    sprite groups: a mode byte, then
+        FULL: count (u16) and count (x, y) pairs (i16 each).
+        SHIFT: the move (dx, dy) of every sprite kept from the baseline,
+            the removed count (u16) and their baseline indexes (u16 each),
+            then the added count (u16) and their (x, y) pairs.
+    shields: a mode byte, then
+        FULL: count (u16) and per shield x, y, width, height (i16 each)
+            and the mask.
+        CHANGED: the removed count (u16) and their baseline indexes,
+            then the changed count (u16) and per shield its index (u16)
+            and the mask.
+        A mask is its zlib-compressed pixels, one byte per pixel, with
+        its length (u16) in front.
+
+A fleet moves as a whole, so a full fleet usually costs a few bytes
+per tick as a SHIFT. Shields only cost bytes on the ticks they get hit.
+"""
+
+import struct
+import zlib
+
+import pygame
+
+from game_stats import MENU, PLAYING, RESPAWNING, LEVEL_TRANSITION, GAME_OVER
+
+GAME_STATES = (MENU, PLAYING, RESPAWNING, LEVEL_TRANSITION, GAME_OVER)
+GROUPS = ("aliens", "bullets", "alien_bullets")
+NO_BASELINE = 0xFFFFFFFF
+
+HEADER = struct.Struct("<IIB")
+STATS = struct.Struct("<QHBBh")
+COUNT = struct.Struct("<H")
+POINT = struct.Struct("<hh")
+RECT = struct.Struct("<hhhh")
+
+# Section flags, in the order the sections follow the header.
+STATS_FLAG = 1
+GROUP_FLAGS = {"aliens": 2, "bullets": 4, "alien_bullets": 8}
+SHIELDS_FLAG = 16
+ALL_FLAGS = STATS_FLAG | sum(GROUP_FLAGS.values()) | SHIELDS_FLAG
+
+# Sprite group and shield modes.
+FULL = 0
+SHIFT = 1
+CHANGED = 1
+
+class Snapshot:
+    """A class to hold the state of one tick, as the server sees it."""
+
+    def __init__(self, tick, stats, groups, shields):
+        """
+        Store the state of tick. groups maps a group name to a list of
+        sprite keys and a list of positions; shields is a list of
+        (key, rect, version, mask data) tuples.
+        """
+        self.tick = tick
+        self.stats = stats
+        self.groups = groups
+        self.shields = shields
+
+class SnapshotCapture:
+    """A class to take snapshots of a running game."""
+
+    def __init__(self, ai_game):
+        """Start with no shield masks packed yet."""
+        self.ai_game = ai_game
+        self.tick = 0
+        # Packed shield masks, by shield, with the version they are of.
+        self.masks = {}
+
+    def _mask_data(self, shield):
+        """Return the compressed pixels of a shield's mask."""
+        packed = self.masks.get(shield)
+        if packed is None or packed[0] != shield.version:
+            surface = shield.mask.to_surface()
+            # The red channel is 255 where the shield stands, else 0.
+            pixels = pygame.image.tobytes(surface, "RGBA")[::4]
+            packed = (shield.version, zlib.compress(pixels, 1))
+            self.masks[shield] = packed
+        return packed[1]
+
+    def capture(self):
+        """Return a snapshot of the game as it is now."""
+        ai_game = self.ai_game
+        if ai_game.fleet:
+            ai_game.fleet.sync_rects()
+        stats = ai_game.stats
+        self.tick += 1
+
+        groups = {}
+        for name in GROUPS:
+            sprites = getattr(ai_game, name).sprites()
+            groups[name] = ([id(sprite) for sprite in sprites],
+                    [sprite.rect.topleft for sprite in sprites])
+        shields = ai_game.shields.sprites()
+        # Forget the masks of shields that are gone.
+        for shield in set(self.masks) - set(shields):
+            del self.masks[shield]
+        return Snapshot(self.tick, (stats.score, stats.level,
+                stats.ship_left, GAME_STATES.index(stats.state),
+                ai_game.ship.rect.x), groups, [(id(shield),
+                tuple(shield.rect), shield.version, self._mask_data(shield))
+                for shield in shields])
+
+def _pack_points(points):
+    """Return a count and the packed (x, y) pairs."""
+    return COUNT.pack(len(points)) + b"".join(POINT.pack(*point)
+            for point in points)
+
+def _pack_indexes(indexes):
+    """Return a count and the packed indexes."""
+    return COUNT.pack(len(indexes)) + b"".join(COUNT.pack(index)
+            for index in indexes)
+
+def _kept(base_keys, keys):
+    """
+    Return the baseline indexes of the keys kept from base_keys, or None
+    if keys isn't the kept keys in their old order followed by new ones.
+    """
+    base_index = {key: index for index, key in enumerate(base_keys)}
+    kept = [base_index[key] for key in keys if key in base_index]
+    if kept != sorted(kept) or any(key in base_index
+            for key in keys[len(kept):]):
+        return None
+    return kept
+
+def _encode_group(base, current):
+    """Return the smaller of a SHIFT and a FULL encoding of a group."""
+    keys, points = current
+    full = bytes((FULL,)) + _pack_points(points)
+    if base is None:
+        return full
+    base_keys, base_points = base
+    kept = _kept(base_keys, keys)
+    if kept is None:
+        return full
+
+    dx = dy = 0
+    if kept:
+        dx = points[0][0] - base_points[kept[0]][0]
+        dy = points[0][1] - base_points[kept[0]][1]
+    for position, base_position in enumerate(kept):
+        x, y = base_points[base_position]
+        if points[position] != (x + dx, y + dy):
+            return full
+
+    kept_set = set(kept)
+    removed = [index for index in range(len(base_keys))
+            if index not in kept_set]
+    shift = (bytes((SHIFT,)) + POINT.pack(dx, dy) + _pack_indexes(removed)
+            + _pack_points(points[len(kept):]))
+    return shift if len(shift) < len(full) else full
+
+def _pack_mask(data):
+    """Return a mask with its length in front."""
+    return COUNT.pack(len(data)) + data
+
+def _encode_shields(base, shields):
+    """
+    Return a CHANGED encoding of the shields if they were only damaged
+    or removed since base, else a FULL one.
+    """
+    if base is not None:
+        base_keys = [shield[0] for shield in base]
+        kept = _kept(base_keys, [shield[0] for shield in shields])
+        if kept is not None and len(kept) == len(shields) and all(
+                shield[1] == base[index][1]
+                for shield, index in zip(shields, kept)):
+            kept_set = set(kept)
+            removed = [index for index in range(len(base))
+                    if index not in kept_set]
+            changed = [(index, shield[3]) for index, (shield, base_index)
+                    in enumerate(zip(shields, kept))
+                    if shield[2] != base[base_index][2]]
+            return (bytes((CHANGED,)) + _pack_indexes(removed)
+                    + COUNT.pack(len(changed)) + b"".join(COUNT.pack(index)
+                    + _pack_mask(data) for index, data in changed))
+
+    return bytes((FULL,)) + COUNT.pack(len(shields)) + b"".join(
+            RECT.pack(*rect) + _pack_mask(data)
+            for key, rect, version, data in shields)
+
+def encode(snapshot, baseline=None):
+    """Return snapshot packed as a delta against baseline, or in full."""
+    flags = 0
+    sections = []
+    if baseline is None or snapshot.stats != baseline.stats:
+        flags |= STATS_FLAG
+        sections.append(STATS.pack(*snapshot.stats))
+    for name in GROUPS:
+        base = baseline.groups[name] if baseline else None
+        if base is None or snapshot.groups[name][1] != base[1]:
+            flags |= GROUP_FLAGS[name]
+            sections.append(_encode_group(base, snapshot.groups[name]))
+    base = baseline.shields if baseline else None
+    if base is None or [shield[:3] for shield in snapshot.shields] != [
+            shield[:3] for shield in base]:
+        flags |= SHIELDS_FLAG
+        sections.append(_encode_shields(base, snapshot.shields))
+
+    baseline_tick = baseline.tick if baseline else NO_BASELINE
+    return HEADER.pack(snapshot.tick, baseline_tick, flags) + b"".join(
+            sections)
+
+def peek_baseline(data):
+    """Return the tick and the baseline tick of an encoded snapshot."""
+    if len(data) < HEADER.size:
+        raise ValueError("snapshot is truncated")
+    tick, baseline_tick, flags = HEADER.unpack_from(data)
+    return tick, baseline_tick
+
+class _Reader:
+    """A class to read the fields of an encoded snapshot in order."""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, layout):
+        """Unpack the next fields with a struct layout."""
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def read_byte(self):
+        """Return the next byte."""
+        self.offset += 1
+        return self.data[self.offset - 1]
+
+    def read_points(self):
+        """Return a counted list of (x, y) pairs."""
+        count, = self.read(COUNT)
+        return [self.read(POINT) for _ in range(count)]
+
+    def read_indexes(self):
+        """Return a counted list of indexes."""
+        count, = self.read(COUNT)
+        return [self.read(COUNT)[0] for _ in range(count)]
+
+    def read_mask(self):
+        """Return the pixels of a mask."""
+        length, = self.read(COUNT)
+        self.offset += length
+        return zlib.decompress(self.data[self.offset - length:self.offset])
+
+def _decode_group(reader, base):
+    """Return the positions of a group from its encoding."""
+    if reader.read_byte() == FULL:
+        return reader.read_points()
+    dx, dy = reader.read(POINT)
+    removed = set(reader.read_indexes())
+    points = [(x + dx, y + dy) for index, (x, y) in enumerate(base)
+            if index not in removed]
+    return points + reader.read_points()
+
+def _decode_shields(reader, base):
+    """Return the (rect, pixels) of the shields from their encoding."""
+    if reader.read_byte() == FULL:
+        count, = reader.read(COUNT)
+        return [(reader.read(RECT), reader.read_mask())
+                for _ in range(count)]
+    removed = set(reader.read_indexes())
+    shields = [shield for index, shield in enumerate(base)
+            if index not in removed]
+    count, = reader.read(COUNT)
+    for _ in range(count):
+        index, = reader.read(COUNT)
+        shields[index] = (shields[index][0], reader.read_mask())
+    return shields
+
+def decode(data, baseline=None):
+    """
+    Return the state in data as a dict, applied to the baseline state
+    it was encoded against. The client keeps these dicts as baselines.
+    Raises ValueError if data is cut short or corrupt, or if it needs
+    another baseline.
+    """
+    try:
+        return _decode(data, baseline)
+    except (struct.error, IndexError, KeyError, TypeError,
+            zlib.error) as e:
+        raise ValueError("snapshot is truncated or corrupt") from e
+
+def _decode(data, baseline):
+    """Decode data without turning errors into ValueError."""
+    reader = _Reader(data)
+    tick, baseline_tick, flags = reader.read(HEADER)
+    if baseline_tick != NO_BASELINE and (baseline is None
+            or baseline["tick"] != baseline_tick):
+        raise ValueError("snapshot {} needs baseline {}".format(tick,
+                baseline_tick))
+    if baseline_tick == NO_BASELINE:
+        baseline = None
+        if flags != ALL_FLAGS:
+            raise ValueError("snapshot without a baseline lacks sections")
+
+    state = dict(baseline) if baseline else {}
+    state["tick"] = tick
+    if flags & STATS_FLAG:
+        state["stats"] = reader.read(STATS)
+    for name in GROUPS:
+        if flags & GROUP_FLAGS[name]:
+            state[name] = _decode_group(reader,
+                    baseline[name] if baseline else None)
+    if flags & SHIELDS_FLAG:
+        state["shields"] = _decode_shields(reader,
+                baseline["shields"] if baseline else None)
+    if reader.offset != len(data):
+        raise ValueError("snapshot has {} bytes too many".format(
+                len(data) - reader.offset))
+    return state
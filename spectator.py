@@ -0,0 +1,338 @@
+"""Stream a game to spectators on the local network.
+
+The server runs an asyncio TCP server on a background thread. Every
+tick the game thread captures a snapshot, and the server sends each
+spectator that snapshot delta-encoded against the last one the
+spectator acknowledged (see snapshot.py). A spectator that falls
+behind skips ticks instead of queueing them up.
+
+Messages from the server are a hello with the screen size, then
+snapshots, each with its length (u32) in front. A spectator answers
+every snapshot with its tick (u32).
+
+Examples:
+    python spectator.py serve            # play and let others watch
+    python spectator.py serve --bot      # let a bot play headless
+    python spectator.py watch 192.168.1.10
+"""
+
+import argparse
+import asyncio
+import socket
+import struct
+import threading
+from time import perf_counter, sleep
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from assets import Assets
+from game_stats import PLAYING
+from headless import sweeping_bot
+from settings import Settings
+from snapshot import (SnapshotCapture, GAME_STATES, NO_BASELINE, encode,
+        decode, peek_baseline)
+
+HELLO = struct.Struct("<HH")
+LENGTH = struct.Struct("<I")
+ACK = struct.Struct("<I")
+
+class SpectatorServer:
+    """A class to send the snapshots of a game to spectators over TCP."""
+
+    def __init__(self, ai_game, host="", port=None):
+        """Prepare the server; start() opens the port."""
+        settings = ai_game.settings
+        self.host = host
+        self.port = settings.spectator_port if port is None else port
+        self.screen_size = ai_game.screen.get_size()
+        self.capture = SnapshotCapture(ai_game)
+        self.history_length = settings.spectator_history
+        self.buffer_limit = settings.spectator_buffer_limit
+
+        # Recent snapshots by tick, and the last tick each client
+        #   acknowledged, by its stream writer.
+        self.history = {}
+        self.clients = {}
+        # Totals for measuring bandwidth and encoding cost.
+        self.bytes_sent = 0
+        self.messages_sent = 0
+        self.encode_time = 0.0
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.ready = threading.Event()
+        self.error = None
+
+    def start(self):
+        """Start serving on a background thread and return the port."""
+        self.thread.start()
+        self.ready.wait()
+        if self.error:
+            raise self.error
+        return self.port
+
+    def stop(self):
+        """Disconnect every client and stop the server thread."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def _run(self):
+        """Run the event loop of the server thread."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            server = self.loop.run_until_complete(asyncio.start_server(
+                    self._serve_client, self.host, self.port))
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        self.loop.run_forever()
+
+        # Closing the connections ends the client tasks.
+        server.close()
+        for writer in self.clients:
+            writer.close()
+        self.loop.run_until_complete(asyncio.gather(
+                *asyncio.all_tasks(self.loop), return_exceptions=True))
+        self.loop.close()
+
+    async def _serve_client(self, reader, writer):
+        """Greet a new client and read its acknowledgements."""
+        writer.write(HELLO.pack(*self.screen_size))
+        self.clients[writer] = None
+        try:
+            while True:
+                tick, = ACK.unpack(await reader.readexactly(ACK.size))
+                self.clients[writer] = tick
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self.clients[writer]
+            writer.close()
+
+    def publish(self):
+        """Capture this tick and send it to the spectators."""
+        if not self.clients:
+            return
+        # The snapshot is taken here, in the game thread; the encoding
+        #   and sending happen in the server thread.
+        self.loop.call_soon_threadsafe(self._broadcast,
+                self.capture.capture())
+
+    def _broadcast(self, snapshot):
+        """Send snapshot to every client that keeps up."""
+        self.history[snapshot.tick] = snapshot
+        self.history.pop(snapshot.tick - self.history_length, None)
+
+        # Clients that acknowledged the same tick get the same message.
+        messages = {}
+        for writer, acked in self.clients.items():
+            if (writer.is_closing() or writer.transport
+                    .get_write_buffer_size() > self.buffer_limit):
+                continue
+            baseline = self.history.get(acked)
+            message = messages.get(acked if baseline else None)
+            if message is None:
+                start = perf_counter()
+                data = encode(snapshot, baseline)
+                self.encode_time += perf_counter() - start
+                message = LENGTH.pack(len(data)) + data
+                messages[acked if baseline else None] = message
+            writer.write(message)
+            self.bytes_sent += len(message)
+            self.messages_sent += 1
+
+class SpectatorClient:
+    """A class to receive the snapshots of a game from a server."""
+
+    def __init__(self, host, port):
+        """Connect to the server and read the screen size."""
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        hello = b""
+        while len(hello) < HELLO.size:
+            data = self.sock.recv(HELLO.size - len(hello))
+            if not data:
+                raise ConnectionError("server closed the connection")
+            hello += data
+        self.screen_size = HELLO.unpack(hello)
+        self.sock.setblocking(False)
+
+        self.buffer = bytearray()
+        # Recent states by tick; the server encodes against one of them.
+        self.states = {}
+        self.state = None
+        self.connected = True
+        # Totals for measuring bandwidth and decoding cost.
+        self.bytes_received = 0
+        self.snapshots_received = 0
+        self.decode_time = 0.0
+
+    def receive(self):
+        """Apply every snapshot that arrived; return False once closed."""
+        while self.connected:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except ConnectionError:
+                data = b""
+            if not data:
+                self.connected = False
+            self.buffer += data
+            self.bytes_received += len(data)
+
+        while len(self.buffer) >= LENGTH.size:
+            length, = LENGTH.unpack_from(self.buffer)
+            end = LENGTH.size + length
+            if len(self.buffer) < end:
+                break
+            self._apply(bytes(self.buffer[LENGTH.size:end]))
+            del self.buffer[:end]
+        return self.connected
+
+    def _apply(self, data):
+        """Decode a snapshot and acknowledge it."""
+        tick, baseline_tick = peek_baseline(data)
+        start = perf_counter()
+        self.state = decode(data, self.states.get(baseline_tick))
+        self.decode_time += perf_counter() - start
+        self.snapshots_received += 1
+
+        # The server only encodes against acknowledged ticks, and the
+        #   acknowledgements only go up.
+        if baseline_tick != NO_BASELINE:
+            for old_tick in [old_tick for old_tick in self.states
+                    if old_tick < baseline_tick]:
+                del self.states[old_tick]
+        self.states[tick] = self.state
+        try:
+            self.sock.send(ACK.pack(tick))
+        except (BlockingIOError, ConnectionError):
+            pass
+
+    def close(self):
+        """Close the connection."""
+        self.sock.close()
+
+class SpectatorView:
+    """A class to draw the state a client received."""
+
+    def __init__(self, screen, settings, assets):
+        """Load the images the game draws with."""
+        self.screen = screen
+        self.settings = settings
+        self.ship_image = assets.image("ship.bmp")
+        self.alien_image = assets.image("alien.bmp")
+        self.bullet_image = pygame.Surface((settings.bullet_width,
+                settings.bullet_height))
+        self.bullet_image.fill(settings.bullet_color)
+        self.font = assets.font(36)
+        # Shield images by rect and mask pixels; rebuilt after damage.
+        self.shield_images = {}
+
+    def _shield_image(self, rect, pixels):
+        """Return the image of a shield from its mask pixels."""
+        key = (rect, pixels)
+        image = self.shield_images.get(key)
+        if image is None:
+            image = pygame.image.frombytes(pixels, rect[2:], "P")
+            image.set_palette_at(0, self.settings.bg_color)
+            image.set_palette_at(255, self.settings.shield_color)
+            image.set_colorkey(0)
+            self.shield_images[key] = image
+        return image
+
+    def draw(self, state):
+        """Draw state on the screen."""
+        screen = self.screen
+        screen.fill(self.settings.bg_color)
+        if state is None:
+            return
+
+        shields = {(tuple(rect), pixels) for rect, pixels in state["shields"]}
+        for key in set(self.shield_images) - shields:
+            del self.shield_images[key]
+        screen.blits([(self._shield_image(*key), key[0][:2])
+                for key in shields], False)
+        for name, image in (("aliens", self.alien_image),
+                ("bullets", self.bullet_image),
+                ("alien_bullets", self.bullet_image)):
+            screen.blits([(image, position) for position in state[name]],
+                    False)
+
+        score, level, ships_left, state_index, ship_x = state["stats"]
+        screen.blit(self.ship_image, (ship_x,
+                screen.get_height() - self.ship_image.get_height()))
+        text = "Score {:,}  Level {}  Ships {}".format(score, level,
+                ships_left)
+        if GAME_STATES[state_index] != PLAYING:
+            text += "  ({})".format(GAME_STATES[state_index])
+        screen.blit(self.font.render(text, True, (30, 30, 30)), (20, 20))
+
+def watch(host, port):
+    """Open a window and show the game streamed by the server."""
+    client = SpectatorClient(host, port)
+    pygame.init()
+    screen = pygame.display.set_mode(client.screen_size, pygame.SCALED)
+    pygame.display.set_caption("Alien Invasion - watching {}".format(host))
+    settings = Settings()
+    view = SpectatorView(screen, settings, Assets())
+    clock = pygame.time.Clock()
+
+    while client.receive():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                client.close()
+                return
+        view.draw(client.state)
+        pygame.display.flip()
+        clock.tick(settings.max_fps)
+    print("The server closed the connection.")
+
+def paced(script, ticks_per_second):
+    """Wrap a headless script so the game runs in real time."""
+    start = perf_counter()
+    def paced_script(ai_game, tick):
+        delay = start + tick / ticks_per_second - perf_counter()
+        if delay > 0:
+            sleep(delay)
+        return script(ai_game, tick)
+    return paced_script
+
+def serve(port, bot=False, seed=None):
+    """Play a game, or let the bot play, while spectators watch."""
+    ai_game = AlienInvasion(headless=bot, seed=seed)
+    server = SpectatorServer(ai_game, port=port)
+    print("Serving spectators on port {}".format(server.start()))
+    ai_game.spectators = server
+    if not bot:
+        ai_game.run_game()
+    while True:
+        ai_game._medium_clicked()
+        ai_game.run_headless(paced(sweeping_bot,
+                ai_game.settings.ticks_per_second))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="host a game")
+    serve_parser.add_argument("--bot", action="store_true",
+            help="let a bot play without a window")
+    serve_parser.add_argument("--seed", type=int, default=None)
+    watch_parser = commands.add_parser("watch", help="watch a game")
+    watch_parser.add_argument("host", nargs="?", default="127.0.0.1")
+    for command_parser in (serve_parser, watch_parser):
+        command_parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port, args.bot, args.seed)
+    else:
+        watch(args.host, args.port or Settings().spectator_port)
+
+if __name__ == "__main__":
+    main()
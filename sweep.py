@@ -0,0 +1,193 @@
+"""Sweep a grid of settings with bot-played games on every CPU core.
+
+Every --vary option names a setting and the values to try. Plain names
+are Settings attributes, set before each game is created. Names
+starting with profiles. or level_scales. edit the difficulty profile
+file, e.g. profiles.medium.alien_speed; settings that come from the
+profiles, like alien_speed, can only be varied that way. The sweep
+plays --games seeded games with the sweeping bot for every point of the
+grid, using the same seeds for every point, and prints the mean
+survival level, score and ship hits of each point.
+
+Example:
+    python sweep.py --vary profiles.medium.alien_speed=150,180,210 \\
+            --vary ship_limit=2,3 --games 50 --csv sweep.csv
+"""
+
+import argparse
+import copy
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import mean
+from time import perf_counter
+
+from alien_invasion import AlienInvasion
+from headless import sweeping_bot
+from profiles import LEVELED, parse_profiles
+from settings import Settings
+
+# Setting names with these prefixes edit the profile file data.
+PROFILE_KEYS = ("profiles.", "level_scales.", "levels")
+# Settings that are set anew for every difficulty and level, or worked
+#   out from other settings, so varying them would change nothing.
+PROFILE_SETTINGS = tuple(LEVELED) + ("no_shields", "formations")
+DYNAMIC_SETTINGS = ("difficulty", "fleet_direction", "level")
+DERIVED_SETTINGS = {"time_step": "ticks_per_second"}
+
+def parse_vary(option):
+    """Turn 'name=1,2,3' into ('name', [1, 2, 3])."""
+    name, _, values = option.partition("=")
+    if not name or not values:
+        raise argparse.ArgumentTypeError(
+                "expected name=value,value,... but got {!r}".format(option))
+    return name, [json.loads(value) for value in values.split(",")]
+
+def _set_path(data, name, value):
+    """Set the value at a dotted path like profiles.easy.alien_speed."""
+    *parents, key = name.split(".")
+    for parent in parents:
+        data = data[parent]
+    data[key] = value
+
+def check_varied(varied):
+    """Raise ValueError for a varied setting that would have no effect."""
+    settings = Settings()
+    for name, values in varied:
+        if name.startswith(PROFILE_KEYS):
+            continue
+        if name in PROFILE_SETTINGS:
+            raise ValueError("{0} is set by the difficulty profile; vary "
+                    "profiles.<difficulty>.{0} instead".format(name))
+        if name in DERIVED_SETTINGS:
+            raise ValueError("{} follows from {}; vary that instead".format(
+                    name, DERIVED_SETTINGS[name]))
+        if name in DYNAMIC_SETTINGS:
+            raise ValueError("{} is set by the game itself".format(name))
+        if not hasattr(settings, name):
+            raise ValueError("there is no setting named {}".format(name))
+
+def make_settings(point, profiles):
+    """
+    Return new Settings with the varied settings of point. They are
+    set before the game is created, so settings read at startup, like
+    the screen size, take effect as well.
+    """
+    settings = Settings()
+    for name, value in point.items():
+        if not name.startswith(PROFILE_KEYS):
+            setattr(settings, name, value)
+    settings.time_step = 1 / settings.ticks_per_second
+    settings.profiles = profiles
+    return settings
+
+def play_games(point, difficulty, seeds, max_ticks, profile_data):
+    """
+    Play one bot game per seed with the settings of point and return
+    (level, score, ship hits) of every game. Runs in a worker process.
+    """
+    profile_data = copy.deepcopy(profile_data)
+    for name, value in point.items():
+        if name.startswith(PROFILE_KEYS):
+            _set_path(profile_data, name, value)
+    profiles = parse_profiles(profile_data)
+
+    results = []
+    for seed in seeds:
+        ai_game = AlienInvasion(headless=True, seed=seed,
+                settings=make_settings(point, profiles))
+        getattr(ai_game, "_{}_clicked".format(difficulty))()
+        stats = ai_game.run_headless(sweeping_bot, max_ticks)
+        results.append((stats.level, stats.score, stats.ship_hits))
+    return results
+
+def grid_points(varied):
+    """Return every combination of the varied values as a dict."""
+    names = [name for name, values in varied]
+    return [dict(zip(names, values)) for values in itertools.product(
+            *(values for name, values in varied))]
+
+def run_sweep(varied, games, seed=0, difficulty="medium", max_ticks=None,
+        workers=None, batch_size=5):
+    """
+    Play games games for every grid point on a pool of worker
+    processes and return a list of (point, results) pairs.
+    """
+    check_varied(varied)
+    with open(Settings().profile_file) as f:
+        profile_data = json.load(f)
+    points = grid_points(varied)
+    seeds = list(range(seed, seed + games))
+
+    # Games go out in small batches so every core stays busy until the
+    #   end, without paying process overhead for every single game.
+    results = [[] for _ in points]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for index, point in enumerate(points):
+            for start in range(0, games, batch_size):
+                futures.append((index, executor.submit(play_games, point,
+                        difficulty, seeds[start:start + batch_size],
+                        max_ticks, profile_data)))
+        for index, future in futures:
+            results[index].extend(future.result())
+    return list(zip(points, results))
+
+def summarize(point, results):
+    """Return a row with the mean and worst outcomes of a point."""
+    levels, scores, hits = zip(*results)
+    row = dict(point)
+    row.update({"games": len(results), "mean_level": mean(levels),
+            "min_level": min(levels), "max_level": max(levels),
+            "mean_score": mean(scores), "mean_ship_hits": mean(hits)})
+    return row
+
+def main():
+    """Run the sweep and print the results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vary", type=parse_vary, action="append",
+            default=[], metavar="NAME=V1,V2,...")
+    parser.add_argument("--games", type=int, default=20,
+            help="games per grid point")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--difficulty", default="medium",
+            choices=("easy", "medium", "hard"))
+    parser.add_argument("--max-ticks", type=int, default=72000,
+            help="stop games that run longer than this many ticks")
+    parser.add_argument("--workers", type=int, default=None,
+            help="worker processes; defaults to the number of cores")
+    parser.add_argument("--csv", help="also write the table to this file")
+    args = parser.parse_args()
+
+    try:
+        check_varied(args.vary)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = perf_counter()
+    rows = [summarize(point, results) for point, results in run_sweep(
+            args.vary, args.games, args.seed, args.difficulty,
+            args.max_ticks, args.workers)]
+    elapsed = perf_counter() - start
+
+    columns = list(rows[0])
+    print(" ".join("{:>14}".format(column[-14:]) for column in columns))
+    for row in rows:
+        print(" ".join("{:>14.6g}".format(row[column])
+                if isinstance(row[column], (int, float))
+                else "{:>14}".format(str(row[column])) for column in columns))
+    total = len(rows) * args.games
+    print("{} games in {:.2f} s on {} workers ({:.0f} games per minute)"
+            .format(total, elapsed, args.workers or os.cpu_count(),
+            total / elapsed * 60))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Tests for the collision checks.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from collisions import groupcollide
+
+def make_groups(rng):
+    """Return two groups of random sprites, crowded enough to overlap."""
+    groups = []
+    for _ in range(2):
+        group = pygame.sprite.Group()
+        for _ in range(rng.randrange(0, 60)):
+            sprite = pygame.sprite.Sprite()
+            sprite.rect = pygame.Rect(rng.randrange(200), rng.randrange(200),
+                    rng.randrange(1, 40), rng.randrange(1, 40))
+            group.add(sprite)
+        groups.append(group)
+    return groups
+
+def run_check(check, seed, dokill_a, dokill_b):
+    """
+    Run check on fresh groups made from seed. Return the collisions and
+    the sprites left in both groups, as indexes so runs can be compared.
+    """
+    group_a, group_b = make_groups(Random(seed))
+    index = {sprite: number for number, sprite in enumerate(
+            group_a.sprites() + group_b.sprites())}
+    collisions = check(group_a, group_b, dokill_a, dokill_b)
+    return ([(index[sprite], [index[hit] for hit in hits])
+            for sprite, hits in collisions.items()],
+            sorted(index[sprite] for sprite in group_a),
+            sorted(index[sprite] for sprite in group_b))
+
+class GroupCollideTest(unittest.TestCase):
+
+    def test_matches_pygame(self):
+        # Covers either group being the smaller one, empty groups, and
+        #   every combination of kills.
+        for seed in range(300):
+            for dokill_a in (False, True):
+                for dokill_b in (False, True):
+                    self.assertEqual(
+                            run_check(groupcollide, seed, dokill_a, dokill_b),
+                            run_check(pygame.sprite.groupcollide, seed,
+                            dokill_a, dokill_b), (seed, dokill_a, dokill_b))
+
+if __name__ == "__main__":
+    unittest.main()
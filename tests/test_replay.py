@@ -0,0 +1,89 @@
+"""Tests for the replay file format.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+from random import Random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import Replay, MOVE_LEFT, MOVE_RIGHT, FIRE
+
+def random_replay(seed, tick_count):
+    """Return a replay of tick_count ticks of random runs of input."""
+    rng = Random(seed)
+    ticks = bytearray()
+    while len(ticks) < tick_count:
+        bits = rng.choice((0, MOVE_LEFT, MOVE_RIGHT, FIRE, MOVE_LEFT | FIRE))
+        # Runs both shorter and longer than one LEB128 byte can hold.
+        ticks.extend(bytes((bits,)) * rng.choice((1, 5, 127, 128, 20000)))
+    replay = Replay(seed, "hard", rng.getrandbits(64), 120,
+            ticks[:tick_count])
+    replay.final_score = 12345
+    replay.final_level = 6
+    return replay
+
+class ReplayFormatTest(unittest.TestCase):
+
+    def assert_same(self, replay, loaded):
+        for name in ("seed", "difficulty", "profile_hash",
+                "ticks_per_second", "ticks", "final_score", "final_level"):
+            self.assertEqual(getattr(loaded, name), getattr(replay, name))
+
+    def test_round_trip(self):
+        for seed in range(20):
+            replay = random_replay(seed, 50000)
+            self.assert_same(replay, Replay.from_bytes(replay.to_bytes()))
+
+    def test_empty_replay(self):
+        replay = Replay(1, "easy", 0, 120)
+        self.assert_same(replay, Replay.from_bytes(replay.to_bytes()))
+
+    def test_every_truncation_raises_value_error(self):
+        data = random_replay(3, 2000).to_bytes()
+        for length in range(len(data)):
+            with self.assertRaises(ValueError):
+                Replay.from_bytes(data[:length])
+
+    def test_not_a_replay(self):
+        data = bytearray(random_replay(4, 100).to_bytes())
+        data[0] ^= 0xFF
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(bytes(data))
+        # A difficulty index past the known difficulties; it follows
+        #   the magic, version and seed.
+        data = bytearray(random_replay(4, 100).to_bytes())
+        data[13] = 9
+        with self.assertRaises(ValueError):
+            Replay.from_bytes(bytes(data))
+
+class ReplayPlaybackTest(unittest.TestCase):
+
+    def test_recorded_game_plays_back_the_same(self):
+        from alien_invasion import AlienInvasion
+        from headless import sweeping_bot
+        from replay import play_replay
+
+        ai_game = AlienInvasion(headless=True, seed=11)
+        ai_game.settings.record_replays = True
+        ai_game._hard_clicked()
+        # The game is cut short, so its replay is never saved.
+        stats = ai_game.run_headless(sweeping_bot, max_ticks=3000)
+        self.assertTrue(stats.game_active)
+        replay = Replay.from_bytes(ai_game.replay.to_bytes())
+
+        played = play_replay(replay)
+        self.assertEqual((played.score, played.level, played.ship_left),
+                (stats.score, stats.level, stats.ship_left))
+
+        # A replay of another version of the profile is refused.
+        replay.profile_hash ^= 1
+        with self.assertRaises(ValueError):
+            play_replay(replay)
+
+if __name__ == "__main__":
+    unittest.main()
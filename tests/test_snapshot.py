@@ -0,0 +1,134 @@
+"""Tests for the spectator snapshot format.
+
+Run from the repository root:
+    python -m pytest tests
+"""
+
+import os
+import sys
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alien_invasion import AlienInvasion
+from headless import sweeping_bot
+from snapshot import (SnapshotCapture, GROUPS, CHANGED, HEADER, encode,
+        decode)
+
+def play(ai_game, ticks):
+    """Play ticks ticks with the bot; yield the game after every tick."""
+    time_step = ai_game.settings.time_step
+    for tick in range(ticks):
+        for event in sweeping_bot(ai_game, tick):
+            ai_game._handle_event(event)
+        if not ai_game.stats.game_active:
+            ai_game._start_game()
+        ai_game._poll_controls()
+        ai_game._tick(time_step)
+        yield ai_game
+
+def start_game(seed):
+    """Return a bot game in progress."""
+    ai_game = AlienInvasion(headless=True, seed=seed)
+    ai_game._start_game(seed=seed)
+    return ai_game
+
+class SnapshotTest(unittest.TestCase):
+
+    def assert_matches(self, state, snapshot):
+        """Check a decoded state against the snapshot it came from."""
+        self.assertEqual(state["tick"], snapshot.tick)
+        self.assertEqual(tuple(state["stats"]), snapshot.stats)
+        for name in GROUPS:
+            self.assertEqual([tuple(point) for point in state[name]],
+                    snapshot.groups[name][1])
+        self.assertEqual([(tuple(rect), pixels)
+                for rect, pixels in state["shields"]],
+                [(rect, zlib.decompress(data))
+                for key, rect, version, data in snapshot.shields])
+
+    def test_deltas_track_the_game(self):
+        # Every tick is encoded against the state acknowledged a few
+        #   ticks ago, the way a spectator on a slow link sees it.
+        lag = 3
+        ai_game = start_game(5)
+        capture = SnapshotCapture(ai_game)
+        snapshots = {}
+        states = {}
+        for ai_game in play(ai_game, 12000):
+            snapshot = capture.capture()
+            baseline = snapshots.get(snapshot.tick - lag)
+            data = encode(snapshot, baseline)
+            state = decode(data, states.get(snapshot.tick - lag))
+            self.assert_matches(state, snapshot)
+            snapshots[snapshot.tick] = snapshot
+            states[snapshot.tick] = state
+            snapshots.pop(snapshot.tick - lag, None)
+            states.pop(snapshot.tick - lag, None)
+
+        # The state decoded at the end matches the game itself.
+        for name in GROUPS:
+            self.assertEqual([tuple(point) for point in state[name]],
+                    [sprite.rect.topleft
+                    for sprite in getattr(ai_game, name)])
+        self.assertEqual(state["stats"][0], ai_game.stats.score)
+
+    def test_a_moving_fleet_is_a_shift(self):
+        # Nobody fires, so only the fleet changes.
+        ai_game = start_game(2)
+        capture = SnapshotCapture(ai_game)
+        baseline = capture.capture()
+        for _ in range(30):
+            ai_game._tick(ai_game.settings.time_step)
+        snapshot = capture.capture()
+        self.assertNotEqual(snapshot.groups["aliens"][1],
+                baseline.groups["aliens"][1])
+
+        # The header, then the mode, move and two empty counts.
+        delta = encode(snapshot, baseline)
+        self.assertEqual(len(delta), HEADER.size + 1 + 4 + 2 + 2)
+        self.assert_matches(decode(delta, decode(encode(baseline))),
+                snapshot)
+
+    def test_damaged_shield_sends_only_its_mask(self):
+        ai_game = start_game(3)
+        capture = SnapshotCapture(ai_game)
+        baseline = capture.capture()
+        shield = ai_game.shields.sprites()[1]
+        ai_game.shields.plow(shield, shield.rect.inflate(-40, -10))
+        snapshot = capture.capture()
+
+        delta = encode(snapshot, baseline)
+        full = encode(snapshot)
+        self.assertEqual(delta[HEADER.size], CHANGED)
+        self.assertLess(len(delta), len(full) // 2)
+        self.assert_matches(decode(delta, decode(encode(baseline))),
+                snapshot)
+
+    def test_every_truncation_raises_value_error(self):
+        ai_game = start_game(4)
+        capture = SnapshotCapture(ai_game)
+        baseline = capture.capture()
+        for ai_game in play(ai_game, 200):
+            pass
+        snapshot = capture.capture()
+        base_state = decode(encode(baseline))
+        for data, base in ((encode(snapshot), None),
+                (encode(snapshot, baseline), base_state)):
+            for length in range(len(data)):
+                with self.assertRaises(ValueError):
+                    decode(data[:length], base)
+            with self.assertRaises(ValueError):
+                decode(data + b"\0", base)
+
+    def test_missing_baseline_raises_value_error(self):
+        ai_game = start_game(6)
+        capture = SnapshotCapture(ai_game)
+        baseline = capture.capture()
+        snapshot = capture.capture()
+        with self.assertRaises(ValueError):
+            decode(encode(snapshot, baseline))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import pygame
+
+class TextCache:
+    """
+    A class to render text with one font and reuse the surfaces.
+    Labels are cached whole; numbers are composed from cached glyphs so
+    a changing score never goes through font.render again.
+    """
+
+    # Composed numbers kept around, e.g. the score and the high score.
+    max_numbers = 16
+
+    def __init__(self, font):
+        """Initialize empty caches for font."""
+        self.font = font
+        self.labels = {}
+        self.glyphs = {}
+        self.numbers = {}
+
+    def render(self, text, color, background=None):
+        """Return a rendered image of text, rendering it only once."""
+        key = (text, color, background)
+        image = self.labels.get(key)
+        if image is None:
+            image = self.font.render(text, True, color, background)
+            self.labels[key] = image
+        return image
+
+    def _glyph(self, char, color, background):
+        """Return the rendered image of a single character."""
+        key = (char, color, background)
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            glyph = self.font.render(char, True, color, background)
+            self.glyphs[key] = glyph
+        return glyph
+
+    def render_number(self, value, color, background):
+        """Return an image of value with thousands separators."""
+        key = (value, color, background)
+        image = self.numbers.get(key)
+        if image is not None:
+            return image
+
+        glyphs = [self._glyph(char, color, background)
+                for char in "{:,}".format(value)]
+        width = sum(glyph.get_width() for glyph in glyphs)
+        height = max(glyph.get_height() for glyph in glyphs)
+        image = pygame.Surface((width, height))
+        image.fill(background)
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+        if len(self.numbers) >= self.max_numbers:
+            # Drop the oldest number; dicts keep insertion order.
+            del self.numbers[next(iter(self.numbers))]
+        self.numbers[key] = image
+        return image
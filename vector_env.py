@@ -0,0 +1,202 @@
+"""Step many headless games in lockstep for training automated players.
+
+VectorEnv follows the gym vector API: reset() returns the observations
+of all games, and step(actions) applies one action per game and returns
+observations, rewards, done flags and infos. An action holds the replay
+input bits (MOVE_LEFT, MOVE_RIGHT, FIRE), so a trained bot's moves can
+be recorded and played back like any other game.
+
+Observations are NumPy arrays with one row per game: the ship, the
+aliens and both kinds of bullets as position arrays with an alive
+mask, plus lives and level. With frame_size set, every game is also
+rendered off screen and scaled down into a shared uint8 frame buffer.
+Every call returns copies of the arrays, so observations can be kept,
+e.g. in a replay buffer; copy=False skips the copies.
+
+Needs numpy. Example:
+    python vector_env.py --envs 16 --steps 1000 --frame-size 80x60
+"""
+
+import argparse
+from random import Random
+from time import perf_counter
+
+import numpy as np
+import pygame
+
+from alien_invasion import AlienInvasion
+from formations import FORMATIONS
+from game_stats import GAME_OVER, MENU
+from replay import MOVE_LEFT, MOVE_RIGHT, FIRE
+
+# Number of distinct actions: every combination of the input bits.
+ACTION_COUNT = (MOVE_LEFT | MOVE_RIGHT | FIRE) + 1
+
+class VectorEnv:
+    """A class to run num_envs games side by side as one environment."""
+
+    def __init__(self, num_envs, difficulty="medium", ticks_per_step=1,
+            frame_size=None, max_bullets=64, copy=True):
+        """
+        Create num_envs headless games. Every step advances each game
+        by ticks_per_step ticks with the same action. frame_size is the
+        (width, height) of the frame observation, or None for no frames.
+        With copy off, reset() and step() return the observation buffers
+        themselves, which the next call refills in place.
+        """
+        self.num_envs = num_envs
+        self.copy = copy
+        self.difficulty = difficulty
+        self.ticks_per_step = ticks_per_step
+        self.frame_size = frame_size
+        self.games = [AlienInvasion(headless=True)
+                for _ in range(num_envs)]
+        self.rng = Random()
+
+        # The largest fleet any formation can field on this screen.
+        ai_game = self.games[0]
+        alien_size = ai_game.assets.image("alien.bmp").get_size()
+        max_aliens = max(len(ai_game.layout.fleet_template(name, alien_size,
+                ai_game.ship.rect.height).positions) for name in FORMATIONS)
+
+        # Struct-of-arrays state of all games, refilled in place.
+        self.observation = {
+            "ship_x": np.zeros(num_envs, dtype=np.float32),
+            "lives": np.zeros(num_envs, dtype=np.int32),
+            "level": np.zeros(num_envs, dtype=np.int32),
+            "aliens": np.zeros((num_envs, max_aliens, 2), dtype=np.float32),
+            "aliens_alive": np.zeros((num_envs, max_aliens), dtype=bool),
+        }
+        for group in ("bullets", "alien_bullets"):
+            self.observation[group] = np.zeros((num_envs, max_bullets, 2),
+                    dtype=np.float32)
+            self.observation[group + "_alive"] = np.zeros(
+                    (num_envs, max_bullets), dtype=bool)
+
+        if frame_size:
+            self.observation["frame"] = np.zeros(
+                    (num_envs, frame_size[1], frame_size[0], 3),
+                    dtype=np.uint8)
+            self.frame_surface = pygame.Surface(frame_size)
+
+        self.scores = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seed=None):
+        """Start a new game in every environment; return observations."""
+        if seed is not None:
+            self.rng.seed(seed)
+        for index in range(self.num_envs):
+            self._reset_game(index)
+        return self._observe()
+
+    def _reset_game(self, index):
+        """Start a new seeded game in environment index."""
+        ai_game = self.games[index]
+        ai_game.settings.initialize_dynamic_settings(self.difficulty)
+        ai_game._start_game(seed=self.rng.getrandbits(63))
+        self.scores[index] = 0
+
+    def step(self, actions):
+        """
+        Apply one action per game and advance every game. Returns the
+        observations, the score gained as rewards, the done flags and a
+        list of infos. Finished games are reset right away; their info
+        holds the final score, level and ship hits.
+        """
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        infos = [{} for _ in range(self.num_envs)]
+        time_step = self.games[0].settings.time_step
+
+        for index, ai_game in enumerate(self.games):
+            bits = int(actions[index])
+            for _ in range(self.ticks_per_step):
+                ai_game._apply_tick_input(bits)
+                ai_game._tick(time_step)
+                if ai_game.stats.state in (GAME_OVER, MENU):
+                    dones[index] = True
+                    break
+
+            stats = ai_game.stats
+            rewards[index] = stats.score - self.scores[index]
+            self.scores[index] = stats.score
+            if dones[index]:
+                infos[index] = {"score": stats.score, "level": stats.level,
+                        "ship_hits": stats.ship_hits}
+                self._reset_game(index)
+
+        return self._observe(), rewards, dones, infos
+
+    def _observe(self):
+        """Copy the state of every game into the observation arrays."""
+        observation = self.observation
+        for index, ai_game in enumerate(self.games):
+            if ai_game.fleet:
+                ai_game.fleet.sync_rects()
+            observation["ship_x"][index] = ai_game.ship.rect.centerx
+            observation["lives"][index] = ai_game.stats.ship_left
+            observation["level"][index] = ai_game.stats.level
+            for group in ("aliens", "bullets", "alien_bullets"):
+                self._fill(index, group, getattr(ai_game, group))
+            if self.frame_size:
+                self._render(index, ai_game)
+        if self.copy:
+            return {key: array.copy() for key, array in observation.items()}
+        return observation
+
+    def _fill(self, index, group, sprites):
+        """Write the centers of sprites into the arrays of group."""
+        positions = self.observation[group][index]
+        alive = self.observation[group + "_alive"][index]
+        centers = [sprite.rect.center for sprite in sprites]
+        del centers[len(positions):]
+        count = len(centers)
+        if count:
+            positions[:count] = centers
+        positions[count:] = 0
+        alive[:count] = True
+        alive[count:] = False
+
+    def _render(self, index, ai_game):
+        """Draw the game off screen and scale it into the frame buffer."""
+        ai_game._update_screen()
+        pygame.transform.scale(ai_game.screen, self.frame_size,
+                self.frame_surface)
+        # surfarray indexes by (x, y); the buffer is (row, column).
+        self.observation["frame"][index] = pygame.surfarray.pixels3d(
+                self.frame_surface).swapaxes(0, 1)
+
+def main():
+    """Step the environments with random actions and report the speed."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--envs", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--ticks-per-step", type=int, default=1)
+    parser.add_argument("--frame-size", default=None,
+            help="WIDTHxHEIGHT of the frame observation")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    frame_size = None
+    if args.frame_size:
+        frame_size = tuple(int(value)
+                for value in args.frame_size.lower().split("x"))
+    # Nothing keeps the observations here, so they needn't be copied.
+    env = VectorEnv(args.envs, ticks_per_step=args.ticks_per_step,
+            frame_size=frame_size, copy=False)
+    env.reset(args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    games = 0
+    start = perf_counter()
+    for _ in range(args.steps):
+        actions = rng.integers(ACTION_COUNT, size=args.envs)
+        observation, rewards, dones, infos = env.step(actions)
+        games += int(dones.sum())
+    elapsed = perf_counter() - start
+    print("{} steps of {} games in {:.2f} s ({:.0f} game ticks per second), "
+            "{} games finished".format(args.steps, args.envs, elapsed,
+            args.steps * args.envs * args.ticks_per_step / elapsed, games))
+
+if __name__ == "__main__":
+    main()